@@ -0,0 +1,64 @@
+"""
+ebeamsgemp
+==========
+
+Electromagnetic pulses of relativistic electron bunches at a probe
+(e-beam SGEMP): single electrons, uniform / Gaussian / measured micropulses,
+macropulse trains, their spectra and parameter sweeps.
+
+Submodules are imported on first attribute access, so ``import ebeamsgemp``
+costs little more than NumPy; matplotlib is only imported when a figure is
+rendered (see plotting.py).
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+from .physics import C_LIGHT, E_CHARGE, ELECTRON_REST_ENERGY_MEV, EPSILON_0, M_E, lorentz_factors
+
+__version__ = "0.1.0"
+
+_SUBMODULES = (
+    "benchmark",
+    "bessel_table",
+    "convergence",
+    "dirichlet",
+    "freq_grid",
+    "gaussian_macro",
+    "gaussian_micro",
+    "gaussian_modulate_macro",
+    "line_spectrum",
+    "macro_train",
+    "micropulse",
+    "nufft",
+    "physics",
+    "plotting",
+    "probes",
+    "profile_micro",
+    "render",
+    "result_cache",
+    "results",
+    "single_electron",
+    "surrogate",
+    "sweep",
+    "time_grid",
+    "waveform_store",
+)
+
+__all__ = [
+    "C_LIGHT",
+    "E_CHARGE",
+    "ELECTRON_REST_ENERGY_MEV",
+    "EPSILON_0",
+    "M_E",
+    "lorentz_factors",
+    *_SUBMODULES,
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
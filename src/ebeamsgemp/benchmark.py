@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+============
+
+Timing / memory benchmarks of the field and spectrum engines.
+
+Every benchmark series varies one grid parameter of one engine with the
+others fixed:
+
+    single_electron.compute_em_fields          num_points
+    micropulse.compute_fields                  Nt, Nz, batch_size (trapz); engine
+    gaussian_micro.compute_fields              Nt, Ntau; quadrature; Nt (spectral)
+    gaussian_micro.compute_frequency_spectrum  Nf
+    gaussian_macro.compute_macro_spectrum      Nw (frequency points)
+    gaussian_modulate_macro.compute_macro_spectrum  Nw
+
+Each case is timed (best and median of repeated runs after one warm-up; the
+on-disk result cache is bypassed) and run once more under ``tracemalloc`` for
+the peak allocated memory. For numeric axes the log-log slope of time against
+the parameter is reported as the scaling exponent.
+
+Results are written as JSON; a stored baseline (``benchmarks/`` in the
+repository) is compared case by case and the run fails (exit status 1) when a
+case is slower, or needs more memory, than the baseline by more than
+``--threshold``; suspected regressions are re-measured once with a larger
+repeat budget before they count. Baselines are machine specific: regenerate them with
+``--update-baseline`` on the machine that runs the comparison.
+
+Example:
+    python -m ebeamsgemp.benchmark --suite quick --baseline benchmarks/baseline-quick.json
+    python -m ebeamsgemp.benchmark --suite full --output bench.json --plot scaling.png
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import __version__, result_cache
+
+BENCHMARK_FORMAT = 1
+THRESHOLD_DEFAULT = 0.25   # allowed relative slowdown / memory growth
+MIN_TIME_DEFAULT = 0.2     # seconds of repeated runs per case
+MAX_REPEATS = 50
+NOISE_FLOOR = 1e-3         # s; slowdowns below this are timer noise, never regressions
+CONFIRM_FACTOR = 5         # repeat budget of the re-measurement of suspected regressions
+
+Workload = Callable[[], Any]
+
+
+@dataclass
+class Series:
+    """One engine with one parameter (``axis``) varied over ``values``."""
+
+    group: str
+    axis: str
+    values: Sequence[Any]
+    fixed: Dict[str, Any] = field(default_factory=dict)
+
+    def cases(self) -> List[Dict[str, Any]]:
+        return [{**self.fixed, self.axis: value} for value in self.values]
+
+
+# -----------------------------------------------------------------------------
+# Workloads: build the inputs (untimed) and return the call to time
+# -----------------------------------------------------------------------------
+def _single_electron(num_points: int) -> Workload:
+    from . import single_electron
+
+    return lambda: single_electron.compute_em_fields(-1e-9, 1e-9, int(num_points))
+
+
+def _micropulse(Nt: int, Nz: int, batch_size: int, engine: str = "trapz") -> Workload:
+    from . import micropulse as mp
+
+    gamma, beta, v0 = mp.compute_gamma_beta_v0(mp.E_K_EV_DEFAULT)
+    lam = mp.compute_line_charge_density(mp.N_ELECTRONS_DEFAULT, v0, mp.TAU0_DEFAULT)
+    span = mp.REALISTIC_SPAN_MULTIPLIER * mp.TAU0_DEFAULT
+    times = np.linspace(-span, span, mp.ensure_odd(int(Nt)))
+    z_prime = np.linspace(-v0 * mp.TAU0_DEFAULT, v0 * mp.TAU0_DEFAULT, int(Nz))
+    return lambda: mp.compute_fields(times, z_prime, beta, v0, mp.D_DEFAULT, lam, int(batch_size), engine)
+
+
+def _gaussian_micro_fields(Nt: int, Ntau: int, quadrature: str = "simpson") -> Workload:
+    from . import gaussian_micro as gm
+
+    params = gm.SimulationParams(Nt=int(Nt), Ntau=int(Ntau), quadrature=quadrature)
+    t_array = np.linspace(params.t_min, params.t_max, params.Nt)
+    return lambda: gm.compute_fields(t_array, params)
+
+
+def _gaussian_micro_spectrum(Nf: int) -> Workload:
+    from . import gaussian_micro as gm
+
+    params = gm.SimulationParams(Nf=int(Nf))
+    freq = np.logspace(np.log10(params.f_min), np.log10(params.f_max), params.Nf)
+    return lambda: gm.compute_frequency_spectrum(freq, params)
+
+
+def _macro_spectrum(module_name: str) -> Callable[..., Workload]:
+    def build(Nw: int) -> Workload:
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        params = {
+            "N": module.N, "e": module.e, "gamma": module.gamma, "epsilon_0": module.epsilon_0,
+            "d": module.d, "tau_0": module.tau_0, "t_0": module.t_0, "beta": module.beta,
+        }
+        omega = 2 * np.pi * np.linspace(1e8, 3e10, int(Nw))
+        E_micro = module.compute_micro_spectrum(omega, params)
+        return lambda: module.compute_macro_spectrum(omega, E_micro, module.T, module.k_max)
+
+    return build
+
+
+WORKLOADS: Dict[str, Callable[..., Workload]] = {
+    "single_electron.compute_em_fields": _single_electron,
+    "micropulse.compute_fields": _micropulse,
+    "gaussian_micro.compute_fields": _gaussian_micro_fields,
+    "gaussian_micro.compute_frequency_spectrum": _gaussian_micro_spectrum,
+    "gaussian_macro.compute_macro_spectrum": _macro_spectrum("gaussian_macro"),
+    "gaussian_modulate_macro.compute_macro_spectrum": _macro_spectrum("gaussian_modulate_macro"),
+}
+
+
+def _suite(scale: int) -> List[Series]:
+    """Benchmark series; ``scale`` multiplies the largest grid sizes (quick: 1, full: 4)."""
+    micro = "micropulse.compute_fields"
+    gauss = "gaussian_micro.compute_fields"
+    return [
+        Series("single_electron.compute_em_fields", "num_points", [10**4, 10**5, 10**6 * scale]),
+        Series(micro, "Nt", [250, 500, 1000 * scale], {"Nz": 2000, "batch_size": 256}),
+        Series(micro, "Nz", [1000, 2000, 4000 * scale], {"Nt": 500, "batch_size": 256}),
+        Series(micro, "batch_size", [16, 64, 256, 1024], {"Nt": 1000, "Nz": 2000}),
+        Series(micro, "engine", ["trapz", "fft", "analytic"], {"Nt": 1001, "Nz": 4000, "batch_size": 256}),
+        Series(gauss, "Nt", [501, 1001, 2001 * scale], {"Ntau": 2001}),
+        Series(gauss, "Ntau", [501, 1001, 2001 * scale], {"Nt": 2001}),
+        Series(gauss, "quadrature", ["simpson", "gauss-hermite", "adaptive", "spectral"], {"Nt": 2001, "Ntau": 2001}),
+        Series(gauss, "Nt", [10**4, 10**5, 10**6 * scale], {"Ntau": 2001, "quadrature": "spectral"}),
+        Series("gaussian_micro.compute_frequency_spectrum", "Nf", [10**3, 10**4, 10**5 * scale]),
+        Series("gaussian_macro.compute_macro_spectrum", "Nw", [10**4, 10**5, 10**6 * scale]),
+        Series("gaussian_modulate_macro.compute_macro_spectrum", "Nw", [10**4, 10**5, 10**6 * scale]),
+    ]
+
+
+SUITES: Dict[str, List[Series]] = {"quick": _suite(1), "full": _suite(4)}
+
+
+# -----------------------------------------------------------------------------
+# Measurement
+# -----------------------------------------------------------------------------
+def case_id(group: str, params: Dict[str, Any]) -> str:
+    """Stable name of a case, e.g. ``micropulse.compute_fields[Nt=500,Nz=2000,batch_size=256]``."""
+    return group + "[" + ",".join(f"{key}={params[key]}" for key in sorted(params)) + "]"
+
+
+def measure(workload: Workload, min_time: float = MIN_TIME_DEFAULT) -> Dict[str, Any]:
+    """Best / median wall time over repeated runs and the tracemalloc peak of one run."""
+    workload()  # warm-up: lazy imports, FFT plans, page faults
+    times: List[float] = []
+    total = 0.0
+    while len(times) < 3 or (total < min_time and len(times) < MAX_REPEATS):
+        start = time.perf_counter()
+        workload()
+        times.append(time.perf_counter() - start)
+        total += times[-1]
+
+    tracemalloc.start()
+    try:
+        workload()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "time_s": min(times),
+        "time_median_s": statistics.median(times),
+        "repeats": len(times),
+        "peak_bytes": int(peak),
+    }
+
+
+def _exponent(values: Sequence[Any], seconds: Sequence[float]) -> Optional[float]:
+    """Least-squares slope of log(time) against log(value); None for categorical axes."""
+    if len(values) < 2 or not all(isinstance(v, (int, float)) and v > 0 for v in values):
+        return None
+    slope, _ = np.polyfit(np.log(np.asarray(values, dtype=float)), np.log(seconds), 1)
+    return float(slope)
+
+
+def run_suite(
+    series: Sequence[Series],
+    min_time: float = MIN_TIME_DEFAULT,
+    match: Optional[str] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """Run every case of ``series`` (optionally only ids containing ``match``)."""
+    cases: Dict[str, Dict[str, Any]] = {}
+    scaling = []
+    with result_cache.bypass():
+        for s in series:
+            timed = []
+            for params in s.cases():
+                cid = case_id(s.group, params)
+                if match and match not in cid:
+                    continue
+                if cid not in cases:
+                    result = measure(WORKLOADS[s.group](**params), min_time)
+                    cases[cid] = {"id": cid, "group": s.group, "params": params, **result}
+                    log(f"{cid:<90s} {result['time_s']*1e3:10.2f} ms {result['peak_bytes']/2**20:9.1f} MiB")
+                timed.append((params[s.axis], cases[cid]["time_s"]))
+            if timed:
+                values, seconds = zip(*timed)
+                scaling.append({
+                    "group": s.group,
+                    "axis": s.axis,
+                    "fixed": s.fixed,
+                    "values": list(values),
+                    "time_s": list(seconds),
+                    "exponent": _exponent(values, seconds),
+                })
+    return {"cases": list(cases.values()), "scaling": scaling}
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "ebeamsgemp": __version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+# -----------------------------------------------------------------------------
+# Baselines
+# -----------------------------------------------------------------------------
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = THRESHOLD_DEFAULT,
+) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Compare a report with a baseline report.
+
+    Returns (regressions, notes), regressions mapping case id -> message: a
+    case regresses when its best time exceeds the baseline median time by
+    more than ``threshold`` (and NOISE_FLOOR seconds), or its peak memory by
+    more than ``threshold``. The baseline median rather than its best run is
+    the reference, so that one unusually fast baseline run does not turn
+    ordinary timer noise into regressions.
+    """
+    reference = {case["id"]: case for case in baseline["cases"]}
+    regressions: Dict[str, str] = {}
+    notes: List[str] = []
+    for case in report["cases"]:
+        ref = reference.get(case["id"])
+        if ref is None:
+            notes.append(f"{case['id']}: not in baseline")
+            continue
+        problems = []
+        ref_time = ref.get("time_median_s", ref["time_s"])
+        ratio = case["time_s"] / ref_time
+        if ratio > 1.0 + threshold and case["time_s"] - ref_time > NOISE_FLOOR:
+            problems.append(f"time {ref_time*1e3:.2f} -> {case['time_s']*1e3:.2f} ms (x{ratio:.2f})")
+        elif ratio < 1.0 / (1.0 + threshold):
+            notes.append(f"{case['id']}: faster than baseline (x{ratio:.2f})")
+        mem_ratio = case["peak_bytes"] / max(ref["peak_bytes"], 1)
+        if mem_ratio > 1.0 + threshold:
+            problems.append(
+                f"peak memory {ref['peak_bytes']/2**20:.1f} -> {case['peak_bytes']/2**20:.1f} MiB (x{mem_ratio:.2f})"
+            )
+        if problems:
+            regressions[case["id"]] = f"{case['id']}: " + ", ".join(problems)
+    return regressions, notes
+
+
+def confirm(report: Dict[str, Any], case_ids: Sequence[str], min_time: float) -> None:
+    """
+    Re-measure suspected regressions with ``CONFIRM_FACTOR`` times the repeat
+    budget and keep the better time, so one noisy burst does not fail a run.
+    """
+    with result_cache.bypass():
+        for case in report["cases"]:
+            if case["id"] in case_ids:
+                result = measure(WORKLOADS[case["group"]](**case["params"]), CONFIRM_FACTOR * min_time)
+                case["time_s"] = min(case["time_s"], result["time_s"])
+                case["peak_bytes"] = min(case["peak_bytes"], result["peak_bytes"])
+
+
+def plot_scaling(report: Dict[str, Any], outfile: str) -> None:
+    """Log-log scaling curves, one panel per engine."""
+    from .plotting import pyplot
+
+    numeric = [s for s in report["scaling"] if s["exponent"] is not None]
+    groups = sorted({s["group"] for s in numeric})
+    if not groups:
+        return
+    plt = pyplot()
+    fig, axes = plt.subplots(len(groups), 1, figsize=(8, 3 * len(groups)), squeeze=False)
+    for ax, group in zip(axes[:, 0], groups):
+        for s in numeric:
+            if s["group"] == group:
+                ax.loglog(s["values"], s["time_s"], "o-", label=f"{s['axis']} (slope {s['exponent']:.2f})")
+        ax.set_title(group, fontsize=10)
+        ax.set_xlabel("grid size")
+        ax.set_ylabel("time (s)")
+        ax.grid(True, which="both", linestyle="--", alpha=0.4)
+        ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(outfile, dpi=150)
+    plt.close(fig)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the field and spectrum engines (time, peak memory, scaling).",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick", help="benchmark suite")
+    parser.add_argument("--match", type=str, default=None, help="only run cases whose id contains this string")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME_DEFAULT, help="seconds of repeats per case")
+    parser.add_argument("--output", type=str, default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", type=str, default=None, help="baseline JSON to compare with (or to write)")
+    parser.add_argument("--update-baseline", action="store_true", help="write the report to --baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD_DEFAULT, help="allowed relative regression")
+    parser.add_argument("--plot", type=str, default=None, help="save scaling curves to this PNG")
+    args = parser.parse_args(argv)
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline needs --baseline PATH")
+    return args
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(data, handle, indent=1)
+        handle.write("\n")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    report = {
+        "format": BENCHMARK_FORMAT,
+        "suite": args.suite,
+        "machine": machine_info(),
+        **run_suite(SUITES[args.suite], args.min_time, args.match),
+    }
+
+    print("=== Scaling (time ~ size^exponent) ===")
+    for s in report["scaling"]:
+        if s["exponent"] is not None:
+            print(f"{s['group']:<50s} {s['axis']:<12s} {s['exponent']:6.2f}")
+
+    status = 0
+    if args.baseline and args.update_baseline:
+        _write_json(args.baseline, report)
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions, notes = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"Re-measuring {len(regressions)} suspected regression(s) ...")
+            confirm(report, list(regressions), args.min_time)
+            regressions, notes = compare(report, baseline, args.threshold)
+        for note in notes:
+            print(f"[note] {note}")
+        for regression in regressions.values():
+            print(f"[REGRESSION] {regression}")
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} of {args.baseline}")
+            status = 1
+        else:
+            print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+
+    if args.output:
+        _write_json(args.output, report)
+        print(f"Report written to {args.output}")
+    if args.plot:
+        plot_scaling(report, args.plot)
+        print(f"Scaling curves saved to {args.plot}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+convergence.py
+==============
+
+Automatic choice of the quadrature / time resolution (Nz, Ntau, Nt).
+
+The driver refines one grid axis at a time on nested grids (N -> 2N - 1, so
+every coarse node is kept) and watches the pulse metrics that users read off
+the result, peak |E| and FWHM. From successive differences
+d_k = Q_k - Q_{k-1} it estimates the observed order
+
+    p = log2(|d_{k-1}| / |d_k|)        (clamped to [P_MIN, P_MAX])
+
+and the Richardson error of the current level, |d_k| / (2^p - 1). An axis is
+accepted only after MIN_LEVELS levels, so that p is observed rather than
+assumed, and once the relative error of every metric is below its share of
+``tol`` (tol / number of refined axes); the
+quadrature axis (Nz / Ntau) is converged first at the starting Nt, then Nt at
+the converged quadrature grid. The result reports the cheapest grid that met
+the tolerance, the achieved error estimate and the Richardson-extrapolated
+metrics.
+
+Grid choices are stored per parameter regime in ``grid_choices.json`` next to
+the result cache (see result_cache.py). A stored grid is re-verified once
+when reused: it is evaluated together with the grid refined once along every
+axis, and a fresh refinement replaces it if the estimated error (P_MIN
+assumed, i.e. twice the difference) exceeds ``tol``. The
+regime is what sets the resolution, not the absolute scales: the bunch to
+single-charge pulse width ratio tau0 / (t0 / (beta gamma)), the time window in
+units of the pulse scale, the engine and the tolerance, each binned.
+
+Used by ``--converge TOL`` in micropulse.py and gaussian_micro.py.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import math
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import physics, result_cache
+
+P_MIN = 1.0                 # assumed order before it can be observed (conservative)
+P_MAX = 8.0
+MIN_LEVELS = 3              # levels per axis before convergence is accepted (observed order)
+METRICS = ("peak_E", "FWHM")
+MAX_POINTS = {"Nt": 2**16 + 1, "Nz": 2**16 + 1, "Ntau": 2**16 + 1}
+REGIME_BINS_PER_OCTAVE = 4  # resolution of the regime key in the width ratio / window span
+GRID_CACHE_FILE = "grid_choices.json"
+GRID_CACHE_FORMAT = 1
+
+Grid = Dict[str, int]
+Metrics = Dict[str, float]
+
+
+@dataclasses.dataclass
+class ConvergenceResult:
+    """Outcome of a convergence run."""
+
+    grid: Grid                                  # cheapest grid that met the tolerance
+    metrics: Metrics                            # peak_E (V/m) and FWHM (s) on that grid
+    error: Metrics                              # estimated relative error of each metric
+    extrapolated: Metrics                       # Richardson-extrapolated metrics
+    converged: bool
+    tol: float
+    history: List[Dict[str, Any]] = dataclasses.field(default_factory=list)
+    cached: bool = False
+
+    def report(self) -> str:
+        grid = ", ".join(f"{k} = {v}" for k, v in self.grid.items())
+        status = "converged" if self.converged else "NOT converged (grid limit reached)"
+        source = " (cached grid choice, re-verified)" if self.cached else f" after {len(self.history)} evaluations"
+        lines = [f"Convergence {status} to tol = {self.tol:.1e}{source}: {grid}"]
+        for name in METRICS:
+            lines.append(
+                f"    {name:<7s} = {self.metrics[name]:.6e}  est. rel. error {self.error[name]:.1e}  "
+                f"extrapolated {self.extrapolated[name]:.6e}"
+            )
+        return "\n".join(lines)
+
+
+# -----------------------------------------------------------------------------
+# Metrics and error estimates
+# -----------------------------------------------------------------------------
+def pulse_metrics(t: np.ndarray, E_x: np.ndarray, E_z: np.ndarray) -> Metrics:
+    """
+    Peak |E| (parabola through the largest sample and its neighbours) and the
+    FWHM from interpolated half-maximum crossings. Unlike raw sample maxima /
+    sample counts, both converge smoothly with the grid spacing.
+    """
+    from .gaussian_micro import compute_field_metrics
+
+    mag = np.hypot(E_x, E_z)
+    i = int(np.argmax(mag))
+    peak = float(mag[i])
+    if 0 < i < mag.size - 1:
+        y0, y1, y2 = mag[i - 1], mag[i], mag[i + 1]
+        h0, h1 = t[i] - t[i - 1], t[i + 1] - t[i]
+        # vertex of the parabola through the three (possibly non-uniform) samples
+        a = (h0 * (y2 - y1) - h1 * (y1 - y0)) / (h0 * h1 * (h0 + h1))
+        b = (y2 - y1) / h1 - a * h1
+        if a < 0.0:
+            peak = float(y1 - b * b / (4.0 * a))
+    return {"peak_E": peak, "FWHM": float(compute_field_metrics(t, E_x, E_z)["FWHM"])}
+
+
+def richardson(values: Sequence[float]) -> Tuple[float, float]:
+    """(relative error estimate, extrapolated value) of the last of a sequence of refinements."""
+    q = values[-1]
+    if len(values) < 2:
+        return math.inf, q
+    d = values[-1] - values[-2]
+    p = P_MIN
+    if len(values) >= 3 and d != 0.0:
+        d_prev = values[-2] - values[-3]
+        if d_prev != 0.0:
+            p = min(P_MAX, max(P_MIN, math.log2(abs(d_prev / d))))
+    correction = d / (2.0**p - 1.0)
+    return abs(correction) / max(abs(q), np.finfo(float).tiny), q + correction
+
+
+def _refine(n: int) -> int:
+    return 2 * n - 1  # nested: keeps every node of linspace(a, b, n)
+
+
+# -----------------------------------------------------------------------------
+# Driver
+# -----------------------------------------------------------------------------
+def converge(
+    evaluate: Callable[[Grid], Metrics],
+    grid: Grid,
+    axes: Sequence[str],
+    tol: float,
+    max_points: Optional[Dict[str, int]] = None,
+) -> ConvergenceResult:
+    """
+    Refine ``axes`` of ``grid`` in turn until every metric of ``evaluate`` is
+    stable to ``tol`` (relative Richardson estimate). Each axis gets an equal
+    share of ``tol``; the reported error is the sum of the per-axis errors.
+    """
+    limits = {**MAX_POINTS, **(max_points or {})}
+    axis_tol = tol / max(1, len(axes))
+    grid = dict(grid)
+    history: List[Dict[str, Any]] = []
+    error: Metrics = {name: 0.0 for name in METRICS}
+    extrapolated: Metrics = {}
+    converged = True
+
+    def run(g: Grid) -> Metrics:
+        start = time.perf_counter()
+        with result_cache.bypass():  # refinement passes are not worth caching
+            metrics = evaluate(g)
+        if not all(math.isfinite(metrics[name]) for name in METRICS):
+            raise ValueError(
+                f"Pulse metrics undefined on grid {g} ({metrics}); "
+                "the time window must contain the half-maximum crossings."
+            )
+        history.append({"grid": dict(g), **metrics, "seconds": time.perf_counter() - start})
+        return metrics
+
+    current = run(grid)
+    for axis in axes:
+        grids = [dict(grid)]
+        levels = {name: [current[name]] for name in METRICS}
+        while True:
+            n = _refine(grids[-1][axis])
+            if n > limits[axis]:
+                converged = False
+                break
+            grids.append({**grids[-1], axis: n})
+            metrics = run(grids[-1])
+            for name in METRICS:
+                levels[name].append(metrics[name])
+            if len(grids) >= MIN_LEVELS and all(
+                richardson(levels[name])[0] <= axis_tol for name in METRICS
+            ):
+                break
+        if len(grids) == 1:
+            continue
+        extrapolated = {name: richardson(levels[name])[1] for name in METRICS}
+
+        def rel_error(k: int) -> Metrics:
+            return {
+                name: abs(extrapolated[name] - levels[name][k]) / max(abs(levels[name][k]), np.finfo(float).tiny)
+                for name in METRICS
+            }
+
+        # the next coarser level may already meet tol: the cheapest grid that does
+        k = len(grids) - 1
+        if all(err <= axis_tol for err in rel_error(k - 1).values()):
+            k -= 1
+        grid = grids[k]
+        current = {name: levels[name][k] for name in METRICS}
+        error = {name: error[name] + err for name, err in rel_error(k).items()}
+    if not extrapolated:
+        extrapolated = dict(current)
+    return ConvergenceResult(grid, current, error, extrapolated, converged, tol, history)
+
+
+# -----------------------------------------------------------------------------
+# Regime cache
+# -----------------------------------------------------------------------------
+def _bin(value: float) -> float:
+    return round(math.log2(value) * REGIME_BINS_PER_OCTAVE) / REGIME_BINS_PER_OCTAVE
+
+
+def regime_key(model: str, method: str, tau0: float, Ek_MeV: float, d: float, span: float, tol: float) -> str:
+    """Cache key of the dimensionless regime that determines the needed resolution."""
+    gamma, beta, _ = physics.lorentz_factors(Ek_MeV)
+    kernel = physics.transit_time(d) / (beta * gamma)
+    scale = max(tau0, kernel)
+    return (
+        f"{model}|{method}|log2(tau0/kernel)={_bin(tau0 / kernel):g}"
+        f"|log2(span/scale)={_bin(span / scale):g}|tol={tol:.0e}"
+    )
+
+
+def _cache_path() -> str:
+    return os.path.join(result_cache.get_cache().directory, GRID_CACHE_FILE)
+
+
+def load_grid_choice(key: str) -> Optional[Dict[str, Any]]:
+    if not result_cache.get_cache().enabled:
+        return None
+    try:
+        with open(_cache_path()) as handle:
+            table = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if table.get("format") != GRID_CACHE_FORMAT:
+        return None
+    return table.get("choices", {}).get(key)
+
+
+def store_grid_choice(key: str, result: ConvergenceResult) -> None:
+    if not result_cache.get_cache().enabled or not result.converged:
+        return
+    path = _cache_path()
+    try:
+        with open(path) as handle:
+            table = json.load(handle)
+        if table.get("format") != GRID_CACHE_FORMAT:
+            raise ValueError
+    except (OSError, ValueError):
+        table = {"format": GRID_CACHE_FORMAT, "choices": {}}
+    table["choices"][key] = {
+        "grid": result.grid,
+        "metrics": result.metrics,
+        "error": result.error,
+        "extrapolated": result.extrapolated,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(table, handle, indent=1)
+    os.replace(tmp, path)  # atomic: concurrent runs never see a partial file
+
+
+def verify_grid(
+    evaluate: Callable[[Grid], Metrics], grid: Grid, axes: Sequence[str], tol: float
+) -> ConvergenceResult:
+    """
+    Check a stored grid with one refinement of every axis. The error of the
+    stored grid is estimated with the conservative order P_MIN; ``converged``
+    tells whether it meets ``tol``.
+    """
+    finer = {**grid, **{axis: _refine(grid[axis]) for axis in axes}}
+    history: List[Dict[str, Any]] = []
+    levels = []
+    for g in (grid, finer):
+        start = time.perf_counter()
+        with result_cache.bypass():
+            levels.append(evaluate(g))
+        history.append({"grid": dict(g), **levels[-1], "seconds": time.perf_counter() - start})
+    metrics, error, extrapolated = levels[0], {}, {}
+    for name in METRICS:
+        extrapolated[name] = richardson([levels[0][name], levels[1][name]])[1]
+        error[name] = abs(extrapolated[name] - metrics[name]) / max(abs(metrics[name]), np.finfo(float).tiny)
+    converged = all(err <= tol for err in error.values())
+    return ConvergenceResult(dict(grid), metrics, error, extrapolated, converged, tol, history, cached=True)
+
+
+def _converge_cached(
+    key: str,
+    evaluate: Callable[[Grid], Metrics],
+    grid: Grid,
+    axes: Sequence[str],
+    tol: float,
+    use_cache: bool,
+) -> ConvergenceResult:
+    if use_cache:
+        entry = load_grid_choice(key)
+        if entry is not None:
+            # the regime key bins the parameters: re-check the stored grid for this case
+            result = verify_grid(evaluate, entry["grid"], axes, tol)
+            if result.converged:
+                return result
+    result = converge(evaluate, grid, axes, tol)
+    if use_cache:
+        store_grid_choice(key, result)
+    return result
+
+
+# -----------------------------------------------------------------------------
+# Engines
+# -----------------------------------------------------------------------------
+def converge_micropulse(
+    t_min: float,
+    t_max: float,
+    tol: float,
+    d: float,
+    E_k_eV: float,
+    N_electrons: float,
+    tau0: float,
+    engine: str = "trapz",
+    Nt0: int = 257,
+    Nz0: int = 257,
+    use_cache: bool = True,
+) -> ConvergenceResult:
+    """Nz (not for engine="analytic") and Nt of micropulse.compute_fields on [t_min, t_max]."""
+    from . import micropulse as mp
+
+    gamma, beta, v0 = mp.compute_gamma_beta_v0(E_k_eV)
+    lam = mp.compute_line_charge_density(N_electrons, v0, tau0)
+
+    def evaluate(grid: Grid) -> Metrics:
+        times = np.linspace(t_min, t_max, grid["Nt"])
+        z_prime = np.linspace(-v0 * tau0, v0 * tau0, grid["Nz"])
+        fields = mp.compute_fields(times, z_prime, beta, v0, d, lam, engine=engine)
+        return pulse_metrics(times, fields["Ex"], fields["Ez"])
+
+    axes = ("Nt",) if engine == "analytic" else ("Nz", "Nt")
+    key = regime_key("micropulse", engine, tau0, E_k_eV * 1e-6, d, t_max - t_min, tol)
+    return _converge_cached(key, evaluate, {"Nt": mp.ensure_odd(Nt0), "Nz": Nz0}, axes, tol, use_cache)
+
+
+def converge_gaussian_micro(
+    params: Any,
+    tol: float,
+    Nt0: int = 257,
+    Ntau0: int = 257,
+    use_cache: bool = True,
+) -> ConvergenceResult:
+    """Ntau (simpson quadrature only) and Nt of gaussian_micro.compute_fields for ``params``."""
+    from . import gaussian_micro as gm
+
+    def evaluate(grid: Grid) -> Metrics:
+        trial = dataclasses.replace(params, **grid)
+        t_array = np.linspace(trial.t_min, trial.t_max, trial.Nt)
+        E_x, E_z, _ = gm.compute_fields(t_array, trial)
+        return pulse_metrics(t_array, E_x, E_z)
+
+    axes = ("Ntau", "Nt") if params.quadrature == "simpson" else ("Nt",)
+    key = regime_key(
+        "gaussian_micro", params.quadrature, params.tau_0, params.Ek_MeV, params.distance,
+        params.t_max - params.t_min, tol,
+    )
+    return _converge_cached(key, evaluate, {"Nt": Nt0, "Ntau": Ntau0}, axes, tol, use_cache)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+dirichlet.py
+============
+
+Fused evaluation of weighted multi-sideband Dirichlet (train interference)
+factors,
+
+    F(w) = sum_j a_j * D_M((w - W_j) * T),   D_M(x) = sin(M*x/2) / sin(x/2),
+
+with M = 2*k_max + 1 bunches, sideband shifts W_j (rad/s) and weights a_j.
+gaussian_macro.py uses W = (0,), gaussian_modulate_macro.py W = (0, +/-pi/(2T));
+any modulation depth or sideband count is just another (offset, weight) list.
+
+Stability without masks: with u = (w - W)*T/(2*pi) (cycles) and the reduced
+phase r = |u - rint(u)| in [0, 1/2], D_M = sin(M*pi*r) / sin(pi*r) exactly
+(M is odd, so the (-1)^q factors cancel). Adding the smallest normal number to
+pi*r leaves every non-zero phase unchanged and turns r = 0 into
+sin(M*eps)/sin(eps) = M, the exact limit; no branch or boolean indexing is
+needed, and the phase never loses precision at high harmonics.
+
+The frequency axis is processed in blocks of CHUNK_SIZE with two scratch
+buffers allocated once; every offset is accumulated into the preallocated
+output in place. dtype="float32" halves memory and bandwidth for very large
+grids (phase error ~1e-7 * w*T/(2*pi) cycles).
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 16  # frequencies per block (scratch stays cache resident)
+DTYPES = ("float64", "float32")
+
+
+def dirichlet_sum(
+    omega: np.ndarray,
+    T: float,
+    k_max: int,
+    offsets: Sequence[float] = (0.0,),
+    weights: Optional[Sequence[float]] = None,
+    dtype: str = "float64",
+    out: Optional[np.ndarray] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    F(omega) = sum_j weights[j] * D_M((omega - offsets[j]) * T).
+
+    ``offsets`` are angular frequency shifts (rad/s), ``weights`` default to 1.
+    ``out`` may be a preallocated array of omega's shape and ``dtype``.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype '{dtype}', expected one of {DTYPES}.")
+    if weights is None:
+        weights = np.ones(len(offsets))
+    if len(weights) != len(offsets):
+        raise ValueError("offsets and weights must have the same length.")
+    work_dtype = np.dtype(dtype)
+    omega = np.asarray(omega)
+    if out is None:
+        out = np.empty(omega.shape, dtype=work_dtype)
+    elif out.shape != omega.shape or out.dtype != work_dtype or not out.flags.c_contiguous:
+        raise ValueError("out must be contiguous and match omega's shape and the requested dtype.")
+
+    M = 2 * k_max + 1
+    tiny = np.finfo(work_dtype).tiny
+    scale = T / (2 * np.pi)
+    terms = [(w_j * scale, a_j) for w_j, a_j in zip(offsets, weights) if a_j != 0.0]
+
+    flat_omega = omega.reshape(-1)
+    flat_out = out.reshape(-1)
+    size = min(chunk_size, flat_omega.size)
+    phase = np.empty(size, dtype=work_dtype)
+    denom = np.empty(size, dtype=work_dtype)
+
+    for start in range(0, flat_omega.size, chunk_size):
+        stop = min(start + chunk_size, flat_omega.size)
+        n = stop - start
+        u, s = phase[:n], denom[:n]
+        acc = flat_out[start:stop]
+        acc.fill(0.0)
+        w = flat_omega[start:stop]
+        for shift, weight in terms:
+            np.multiply(w, scale, out=u, casting="same_kind")
+            np.subtract(u, shift, out=u)
+            np.rint(u, out=s)
+            np.subtract(u, s, out=u)     # reduced phase in [-1/2, 1/2] cycles
+            np.abs(u, out=u)
+            np.multiply(u, np.pi, out=u)
+            np.add(u, tiny, out=u)       # r = 0 -> sin(M*tiny)/sin(tiny) = M
+            np.sin(u, out=s)
+            np.multiply(u, M, out=u)
+            np.sin(u, out=u)
+            np.divide(u, s, out=u)
+            if weight != 1.0:
+                np.multiply(u, weight, out=u)
+            np.add(acc, u, out=acc)
+    return out
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+freq_grid.py
+============
+
+Line-resolving, non-uniform frequency grids for macropulse spectra.
+
+A train of M = 2*k_max + 1 micropulses spaced by T concentrates its spectrum
+in Dirichlet lines at f = n/T (plus f = n/T +/- offset for modulated trains)
+whose main lobe is only 2/(M*T) wide; a 1 us train at T = 550 ps gives ~1 MHz
+lines 1.82 GHz apart. A uniform grid either misses the line tops or wastes
+almost every sample between them. ``line_frequency_grid`` instead places
+
+    * LINE_POINTS uniform samples across +/- LINE_LOBES main-lobe half widths
+      of every line, with the exact line centre included,
+    * a sparse log-spaced background of BACKGROUND_POINTS over [f_min, f_max].
+
+The result is a sorted frequency array (Hz); 2*pi*f can be passed directly to
+compute_macro_spectrum of gaussian_macro.py / gaussian_modulate_macro.py.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+LINE_POINTS = 41          # samples per line (odd, so the centre is included)
+LINE_LOBES = 3.0          # half span around each line in main-lobe half widths 1/(M*T)
+BACKGROUND_POINTS = 2000  # sparse log-spaced samples between the lines
+
+
+def line_centres(
+    f_min: float, f_max: float, T: float, offsets: Sequence[float] = (0.0,)
+) -> np.ndarray:
+    """All n/T + offset inside [f_min, f_max], sorted."""
+    offsets = np.asarray(offsets, dtype=float)
+    n_lo = int(np.floor((f_min - offsets.max()) * T))
+    n_hi = int(np.ceil((f_max - offsets.min()) * T))
+    n = np.arange(n_lo, n_hi + 1)
+    centres = (n[:, None] / T + offsets[None, :]).ravel()
+    return np.unique(centres[(centres >= f_min) & (centres <= f_max)])
+
+
+def line_frequency_grid(
+    f_min: float,
+    f_max: float,
+    T: float,
+    k_max: int,
+    offsets: Sequence[float] = (0.0,),
+    line_points: int = LINE_POINTS,
+    line_lobes: float = LINE_LOBES,
+    background_points: int = BACKGROUND_POINTS,
+) -> np.ndarray:
+    """
+    Non-uniform grid (Hz) dense around every harmonic line and sideband.
+
+    ``offsets`` are the sideband shifts in Hz, e.g. (0, 1/(4T), -1/(4T)) for the
+    +/- pi/(2T) modulation of gaussian_modulate_macro.py.
+    """
+    if f_min <= 0.0 or f_max <= f_min:
+        raise ValueError("Require 0 < f_min < f_max.")
+    line_points = line_points if line_points % 2 == 1 else line_points + 1
+    half_width = line_lobes / ((2 * k_max + 1) * T)
+
+    centres = line_centres(f_min, f_max, T, offsets)
+    local = np.linspace(-half_width, half_width, line_points)
+    local[line_points // 2] = 0.0  # hit every line centre exactly
+    lines = (centres[:, None] + local[None, :]).ravel()
+    background = np.logspace(np.log10(f_min), np.log10(f_max), background_points)
+
+    f = np.unique(np.concatenate([background, lines]))
+    return f[(f >= f_min) & (f <= f_max)]
@@ -0,0 +1,827 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gaussian_micro.py
+
+单文件脚本，用于根据高斯时间结构的电子微束计算时变电磁场并绘制 2x2 中文图。
+依赖: numpy, scipy, matplotlib（pip install -e . 安装 ebeamsgemp 包）
+运行: python -m ebeamsgemp.gaussian_micro
+scipy 的积分/线性代数子模块在用到时才导入，matplotlib 只在绘图时导入。
+批处理: python -m ebeamsgemp.gaussian_micro --no-plot --output results.npz
+        （不导入 matplotlib；之后用 python -m ebeamsgemp.render results.npz 绘图）
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import time
+import warnings
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+from . import physics, result_cache, time_grid
+from .bessel_table import xk1
+from .physics import C_LIGHT, E_CHARGE  # 物理常数 (SI)，全包共用
+from .plotting import plot_line, pyplot
+from .results import save_results
+
+ERF_2 = math.erf(2.0)  # ≈0.995322
+
+# -------------------------- 求积设置 --------------------------
+QUADRATURE_BACKENDS = ("simpson", "gauss-hermite", "adaptive", "spectral")
+GH_MIN_NODES = 8         # Gauss–Hermite 起始节点数
+GH_MAX_NODES = 256       # Gauss–Hermite 节点数上限
+MAX_MEMORY_DEFAULT = 256 * 1024**2  # 工作缓冲内存上限 (bytes)
+WORK_ARRAYS = 5          # 每行占用的工作数组个数：3 个预分配缓冲 + simpson 内部临时数组
+SPECTRAL_MAX_POINTS = 1 << 23   # spectral 后端 FFT 网格点数上限
+SPECTRAL_EXACT_RATIO = 4        # 均匀时间数组逐点对齐的 FFT 网格最多为样条网格的几倍
+ZETA_4 = math.pi**4 / 90.0      # ζ(4)、ζ(5)：周期镜像次阶误差的求和系数
+ZETA_5 = 1.0369277551433699
+
+
+@dataclass
+class SimulationParams:
+    """存放主要可调参数以及派生量，便于传递。"""
+
+    N: float = 1e10              # 电子数量
+    Ek_MeV: float = 10.0           # 束流动能 (MeV)
+    tau_0: float = 100e-12         # 脉冲宽度 (s)
+    distance: float = 1.0          # 探测点到束流轴距离 d (m)
+    Nt: int = 2001                 # 时间采样点数
+    Ntau: int = 2001               # tau 积分采样点数
+    t_min: float = -1e-9           # 时间范围下限 (s)
+    t_max: float = 1e-9            # 时间范围上限 (s)
+    Nf: int = 1000                 # 频率采样点数
+    f_min: float = 1e3             # 频率范围下限 (Hz)
+    f_max: float = 1e10            # 频率范围上限 (Hz)
+    quadrature: str = "simpson"    # tau 积分后端: simpson / gauss-hermite / adaptive / spectral
+    rtol: float = 1e-8             # gauss-hermite / adaptive / spectral 的目标相对误差
+    max_memory: float = MAX_MEMORY_DEFAULT  # (块长, 积分点数) 工作数组的内存上限 (bytes)
+
+    def __post_init__(self) -> None:
+        self.gamma, self.beta, _ = physics.lorentz_factors(self.Ek_MeV)
+        self.t_0 = physics.transit_time(self.distance)
+
+
+def _denominator(tau_plus_t: np.ndarray, params: SimulationParams) -> np.ndarray:
+    """[1 + beta^2 gamma^2 (tau+t)^2 / t_0^2]^{3/2}，带除零保护。"""
+    denom = (
+        1.0
+        + (params.beta**2)
+        * (params.gamma**2)
+        * (tau_plus_t**2)
+        / (params.t_0**2)
+    ) ** 1.5
+    return np.maximum(denom, 1e-30)  # 防止除零
+
+
+@lru_cache(maxsize=None)
+def truncated_hermite_rule(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    返回 n 点截断 Gauss–Hermite 求积节点与权重：
+        ∫_{-2}^{2} exp(-x^2) g(x) dx ≈ Σ w_i g(x_i)
+
+    与 Simpson 路径的 2σ 截断一致（权重和为 sqrt(pi)·Erf(2)）。
+    递推系数由高阶 Gauss–Legendre 离散化后的 Lanczos 过程得到，
+    再用 Golub–Welsch 求三对角矩阵特征值。
+    """
+    from scipy import special
+    from scipy.linalg import eigh_tridiagonal
+
+    x, w = special.roots_legendre(max(4 * n, 200))
+    x = 2.0 * x
+    w = 2.0 * w * np.exp(-x**2)
+
+    alpha = np.zeros(n)
+    beta_off = np.zeros(n)
+    basis = np.zeros((n, x.size))
+    q = np.sqrt(w) / np.sqrt(np.sum(w))
+    q_prev = np.zeros_like(q)
+    b_prev = 0.0
+    for k in range(n):
+        basis[k] = q
+        v = x * q
+        alpha[k] = q @ v
+        v = v - alpha[k] * q - b_prev * q_prev
+        v -= basis[: k + 1].T @ (basis[: k + 1] @ v)  # 完全重正交化
+        beta_off[k] = np.linalg.norm(v)
+        q_prev, q, b_prev = q, v / max(beta_off[k], 1e-300), beta_off[k]
+
+    nodes, vectors = eigh_tridiagonal(alpha, beta_off[:-1])
+    weights = np.sum(w) * vectors[0] ** 2
+    nodes.flags.writeable = False
+    weights.flags.writeable = False
+    return nodes, weights
+
+
+def chunk_rows(n_cols: int, max_memory: float) -> int:
+    """在内存上限内每块可容纳的时间点数（float64，WORK_ARRAYS 个数组）。"""
+    return max(1, int(max_memory // (n_cols * 8 * WORK_ARRAYS)))
+
+
+def chunk_layout(Nt: int, params: SimulationParams) -> tuple[int, int]:
+    """compute_fields 的分块方式：(每块时间点数, 块数)。"""
+    n_cols = params.Ntau if params.quadrature == "simpson" else GH_MAX_NODES
+    rows = min(chunk_rows(n_cols, params.max_memory), Nt)
+    return rows, -(-Nt // rows)
+
+
+def _integrate_simpson(
+    t_array: np.ndarray,
+    params: SimulationParams,
+    tau_array: np.ndarray,
+    exp_factor: np.ndarray,
+    work: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    对一块时间点做复合 Simpson 求积。work 为预分配的 (3, >=块长, Ntau) 缓冲，
+    各块复用；原地运算顺序与整体广播版本一致，结果逐位相同。
+    """
+    from scipy.integrate import simpson
+
+    n = len(t_array)
+    tau_plus_t, denom, f = (buf[:n] for buf in work)
+
+    np.add(t_array[:, None], tau_array[None, :], out=tau_plus_t)
+    np.square(tau_plus_t, out=denom)
+    denom *= (params.beta**2) * (params.gamma**2)
+    denom /= params.t_0**2
+    denom += 1.0
+    np.power(denom, 1.5, out=denom)
+    np.maximum(denom, 1e-30, out=denom)  # 防止除零
+
+    np.divide(exp_factor[None, :], denom, out=f)
+    I_x = simpson(f, tau_array, axis=1)
+    np.divide(tau_plus_t, params.t_0, out=f)
+    np.multiply(exp_factor[None, :], f, out=f)
+    np.divide(f, denom, out=f)
+    I_z = simpson(f, tau_array, axis=1)
+    return I_x, I_z
+
+
+def _gauss_hermite_sums(
+    t_array: np.ndarray, params: SimulationParams, n: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """n 点截断 Gauss–Hermite 求积，只构造 (Nt, n) 矩阵。"""
+    nodes, weights = truncated_hermite_rule(n)
+    tau_plus_t = t_array[:, None] + params.tau_0 * nodes[None, :]
+    inv_denom = 1.0 / _denominator(tau_plus_t, params)
+    scaled = params.tau_0 * weights  # dtau = tau_0 dx
+    return inv_denom @ scaled, (inv_denom * (tau_plus_t / params.t_0)) @ scaled
+
+
+def _gauss_hermite_nodes(t_array: np.ndarray, params: SimulationParams) -> int | None:
+    """
+    节点数自 GH_MIN_NODES 起逐次加倍，直到相邻两次结果的最大相对差
+    小于 params.rtol（相对于本组 t 上的峰值），返回该节点数。核函数宽度
+    t_0/(beta*gamma) 远小于 tau_0 时多项式求积收敛很慢，超过 GH_MAX_NODES
+    仍未收敛则返回 None。
+    """
+    n = GH_MIN_NODES
+    I_x, I_z = _gauss_hermite_sums(t_array, params, n)
+    while n < GH_MAX_NODES:
+        n *= 2
+        J_x, J_z = _gauss_hermite_sums(t_array, params, n)
+        err = max(
+            np.max(np.abs(J_x - I_x)) / max(np.max(np.abs(J_x)), 1e-300),
+            np.max(np.abs(J_z - I_z)) / max(np.max(np.abs(J_z)), 1e-300),
+        )
+        I_x, I_z = J_x, J_z
+        if err <= params.rtol:
+            return n
+    return None
+
+
+def _integrate_adaptive(t_array: np.ndarray, params: SimulationParams) -> tuple[np.ndarray, np.ndarray]:
+    """scipy.integrate.quad_vec 自适应求积，对全部 t 同时细分 tau 区间。"""
+    from scipy.integrate import quad_vec
+
+    def integrand(tau: float) -> np.ndarray:
+        tau_plus_t = t_array + tau
+        weight = np.exp(-(tau / params.tau_0) ** 2) / _denominator(tau_plus_t, params)
+        return np.stack([weight, weight * (tau_plus_t / params.t_0)])
+
+    result, _ = quad_vec(
+        integrand, -2.0 * params.tau_0, 2.0 * params.tau_0, epsrel=params.rtol, norm="max"
+    )
+    return result[0], result[1]
+
+
+@result_cache.cached()
+def compute_fields(t_array: np.ndarray, params: SimulationParams) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    根据给定时间数组与参数计算 E_x, E_z, B_y。
+
+    数值积分形式:
+        E_x(t) ~ ∫ exp(-tau^2/tau_0^2) / [1 + beta^2 gamma^2 (tau+t)^2 / t_0^2]^{3/2} d tau
+        E_z(t) ~ ∫ exp(-tau^2/tau_0^2) (tau+t) / [ ... ]^{3/2} d tau
+        B_y(t) = (beta/c) * E_x(t)
+
+    积分后端由 params.quadrature 选择：
+        simpson       向量化 Simpson 复合求积，高斯权重由指数给出（Ntau 个点）；
+        gauss-hermite 截断高斯权重的 Gaussian 求积，节点数按 params.rtol 在峰值所在块上选取一次，
+                      通常 16~64 个节点即可达到 Simpson 精度；
+        adaptive      quad_vec 自适应细分，误差由 params.rtol 控制；
+        spectral      不做 tau 积分：在 FFT 网格上采样解析频谱并逆变换（见
+                      compute_fields_spectral），O(N log N)，无 (Nt, Ntau) 矩阵。
+
+    时间轴按 params.max_memory 分块流式计算，内存占用与 Nt 无关。
+    """
+    if params.quadrature not in QUADRATURE_BACKENDS:
+        raise ValueError(f"未知求积后端 {params.quadrature!r}，可选 {QUADRATURE_BACKENDS}")
+    if params.quadrature == "spectral":
+        return compute_fields_spectral(t_array, params)
+
+    Nt = len(t_array)
+    rows, _ = chunk_layout(Nt, params)
+
+    if params.quadrature == "simpson":
+        tau_array = np.linspace(-2.0 * params.tau_0, 2.0 * params.tau_0, params.Ntau)
+        exp_factor = np.exp(-(tau_array / params.tau_0) ** 2)  # 仅依赖 tau
+        work = np.empty((3, rows, params.Ntau))
+
+    quadrature = params.quadrature
+    if quadrature == "gauss-hermite":
+        # 节点数只在场峰值（t=0 附近）所在的块上选一次，其余块沿用：误差相对全局峰值，
+        # 尾部小幅值块不会因相对自身峰值的判据而多用节点
+        peak = int(np.argmin(np.abs(t_array)))
+        first = peak - peak % rows
+        n_gh = _gauss_hermite_nodes(t_array[first:first + rows], params)
+        if n_gh is None:
+            warnings.warn(
+                f"Gauss–Hermite 求积在 {GH_MAX_NODES} 个节点内未达到 "
+                f"rtol = {params.rtol:.1e}，改用 adaptive 后端。",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+            quadrature = "adaptive"
+
+    I_x = np.empty(Nt)
+    I_z = np.empty(Nt)
+    for start in range(0, Nt, rows):
+        sl = slice(start, min(start + rows, Nt))
+        if quadrature == "simpson":
+            I_x[sl], I_z[sl] = _integrate_simpson(t_array[sl], params, tau_array, exp_factor, work)
+        elif quadrature == "gauss-hermite":
+            I_x[sl], I_z[sl] = _gauss_hermite_sums(t_array[sl], params, n_gh)
+        else:
+            I_x[sl], I_z[sl] = _integrate_adaptive(t_array[sl], params)
+
+    field_scale = -physics.coulomb_factor(params.N * E_CHARGE) * params.gamma / params.distance**2
+    prefactor_ex = field_scale / (ERF_2 * np.sqrt(np.pi) * params.tau_0)
+    prefactor_ez = params.beta * prefactor_ex
+
+    E_x = prefactor_ex * I_x
+    E_z = prefactor_ez * I_z
+    B_y = params.beta / C_LIGHT * E_x
+
+    return E_x, E_z, B_y
+
+
+def build_adaptive_time_grid(
+    params: SimulationParams, rtol: float = time_grid.RTOL_DEFAULT
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    在 [t_min, t_max] 上生成自适应非均匀时间网格：t≈0 附近按
+    max(tau_0, t_0/(beta*gamma)) 尺度加密，尾部对数稀疏采样，
+    逐次二分直到线性插值误差小于 rtol（相对峰值）。
+    返回 (t_array, E_x, E_z, B_y)：细化过程中已算出的场直接复用，无需再算一遍。
+    """
+    scale = max(params.tau_0, params.t_0 / (params.beta * params.gamma))
+
+    def evaluate(t: np.ndarray) -> np.ndarray:
+        E_x, E_z, _ = compute_fields(t, params)
+        return np.stack([E_x, E_z])
+
+    with result_cache.bypass():  # 细化过程中的中间结果不写入缓存
+        t_array, (E_x, E_z) = time_grid.adaptive_time_grid(evaluate, params.t_min, params.t_max, scale, rtol)
+    return t_array, E_x, E_z, params.beta / C_LIGHT * E_x
+
+
+@result_cache.cached()
+def compute_frequency_spectrum(freq_array: np.ndarray, params: SimulationParams) -> np.ndarray:
+    """
+    计算频域电场谱 \tilde{E}(ω)，ω>=0。
+    输入 freq_array 为 Hz，内部转换到 ω=2πf。
+    """
+    freq_array = np.asarray(freq_array, dtype=float)
+    omega = 2.0 * np.pi * freq_array
+
+    prefactor = -physics.coulomb_factor(params.N * E_CHARGE) * params.gamma / params.distance**2
+    gaussian_factor = np.exp(- (omega**2) * (params.tau_0**2) / 4.0)
+    # ω t0²/(βγ)² · K1(ω t0/(βγ)) = (t0/(βγ)) · x K1(x)；x K1(x) 查共享插值表，ω=0 处取极限 1，无需截断
+    k1_scale = params.t_0 / (params.beta * params.gamma)
+    bessel_term = np.sqrt(2.0 / np.pi) * k1_scale
+    spectrum = prefactor * gaussian_factor * bessel_term * xk1(omega * k1_scale)
+    return spectrum
+
+
+def truncated_gaussian_form_factor(omega: np.ndarray, tau_0: float) -> np.ndarray:
+    """
+    时域路径所用截断高斯权重 exp(-tau^2/tau_0^2)/(erf(2) sqrt(pi) tau_0)，|tau|<=2 tau_0
+    的傅里叶变换（实、偶，G(0)=1）：
+        G(ω) = Re[erf(2 + i y)] e^{-y^2} / erf(2),  y = ω tau_0 / 2
+    用 Faddeeva 函数 w(z) 写成 Re[e^{-y^2} - e^{-4-4iy} w(-y+2i)] / erf(2)，大 y 时不溢出。
+    未截断时即 compute_frequency_spectrum 中的 exp(-ω^2 tau_0^2/4)。
+    """
+    from scipy import special
+
+    y = 0.5 * np.asarray(omega, dtype=float) * tau_0
+    return np.real(np.exp(-y * y) - np.exp(-4.0 - 4.0j * y) * special.wofz(2.0j - y)) / ERF_2
+
+
+def analytic_field_spectra(omega: np.ndarray, params: SimulationParams) -> tuple[np.ndarray, np.ndarray]:
+    """
+    E_x, E_z 的解析频谱（与 compute_frequency_spectrum 相同的 1/sqrt(2π) 约定），
+    与 compute_fields 的时域积分一一对应。a = t_0/(beta*gamma) 为单电子脉冲宽度：
+        Ê_x(ω) = P_x G(ω) 2 a^2 |ω| K1(|ω| a) / sqrt(2π)
+        Ê_z(ω) = -i beta P_x G(ω) 2 a^3 ω K0(|ω| a) / (t_0 sqrt(2π))
+    P_x = -N e gamma / (4π ε0 d^2)，G 为截断高斯形状因子。
+    """
+    from scipy import special
+
+    omega = np.asarray(omega, dtype=float)
+    a = params.t_0 / (params.beta * params.gamma)
+    x = np.abs(omega) * a
+    x_k1 = xk1(x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_k0 = np.where(x > 0.0, x * special.k0(x), 0.0)   # x K0(x) -> 0
+    prefactor = -physics.coulomb_factor(params.N * E_CHARGE) * params.gamma / params.distance**2
+    common = prefactor * truncated_gaussian_form_factor(omega, params.tau_0) * 2.0 * a / np.sqrt(2.0 * np.pi)
+    E_x = common * x_k1
+    E_z = -1j * params.beta * (a / params.t_0) * common * np.sign(omega) * x_k0
+    return E_x, E_z
+
+
+def spectral_bandwidth(params: SimulationParams) -> float:
+    """频谱按 e^{-ω a} 衰减：超过 ω_max = (ln(1/rtol) + 5)/a 的分量相对低于 rtol，a = t_0/(beta*gamma)。"""
+    a = params.t_0 / (params.beta * params.gamma)
+    rtol = min(max(params.rtol, 1e-15), 1e-2)
+    return (np.log(1.0 / rtol) + 5.0) / a
+
+
+def _spectral_guard(params: SimulationParams) -> float:
+    """
+    逆 FFT 的周期镜像误差保护带 g（镜像与观测时刻的最小间隔）。
+    compute_fields_spectral 已解析扣除镜像的主阶尾部 E_x ~ P_x a^3/|s|^3、
+    E_z ~ beta P_x a^3 sign(s)/(t_0 s^2)，剩余的次阶项相对峰值约为
+        E_x: 2ζ(5) r a^3 (6σ^2 + 1.5a^2) / g^5,   E_z: 2ζ(4) r a^2 (3σ^2 + 1.5a^2) / (0.385 g^4)，
+    σ^2 <= tau_0^2/2 为截断高斯的二阶矩，r >= 1 为长束团相对单电子的峰值降低倍数；取两者都不超过 rtol 的 g。
+    """
+    a = params.t_0 / (params.beta * params.gamma)
+    rtol = min(max(params.rtol, 1e-15), 1e-2)
+    sigma2 = 0.5 * params.tau_0**2
+    peak_ratio = max(1.0, np.sqrt(np.pi) * params.tau_0 / (2.0 * a))
+    guard_x = (2.0 * ZETA_5 * peak_ratio * a**3 * (6.0 * sigma2 + 1.5 * a**2) / rtol) ** 0.2
+    guard_z = (2.0 * ZETA_4 * peak_ratio * a**2 * (3.0 * sigma2 + 1.5 * a**2) / (0.385 * rtol)) ** 0.25
+    return max(guard_x, guard_z, 10.0 * (2.0 * params.tau_0 + a))  # 渐近展开只在 |s| >> 2 tau_0 + a 处成立
+
+
+def spectral_grid(t_array: np.ndarray, params: SimulationParams) -> tuple[float, int, int]:
+    """
+    spectral 后端的 FFT 网格 (步长 h, 点数 N, 抽取步 m)，由时间窗、分辨率与 rtol 自动确定：
+
+    * 均匀 t_array（步长 dt）：h = dt/m <= π/ω_max（ω_max 见 spectral_bandwidth），
+      所需时刻恰为网格点，按步长 m 抽取；
+    * 非均匀 t_array，或 dt 远小于 Nyquist 步长（网格点数超过样条网格的 SPECTRAL_EXACT_RATIO 倍）：
+      m = 0，三次样条插值，
+      h 取到样条误差 ~ max_ω (hω)^4 e^{-ωa}/384 <= rtol，即 h ~ (a/4)(384 e^4 rtol)^{1/4}，
+      再留 2.5 倍余量（E_z 的高阶导数更大）；
+    * 周期 P >= max(t_max - t_min, max|t| + g)，g 见 _spectral_guard。
+    """
+    from scipy.fft import next_fast_len
+
+    a = params.t_0 / (params.beta * params.gamma)
+    rtol = min(max(params.rtol, 1e-15), 1e-2)
+    h_nyquist = np.pi / spectral_bandwidth(params)
+    t_min, t_max = float(t_array.min()), float(t_array.max())
+    reach = max(abs(t_min), abs(t_max)) + _spectral_guard(params)
+
+    def size(h: float) -> float:
+        return max(t_max - t_min + 4.0 * h, reach) / h
+
+    h = min(h_nyquist, 0.1 * a * (384.0 * math.e**4 * rtol) ** 0.25)
+    n = size(h)
+    steps = np.diff(t_array)
+    if t_array.size > 1 and steps[0] > 0 and np.allclose(steps, steps[0], rtol=1e-9, atol=0.0):
+        m = max(1, int(np.ceil(steps[0] / h_nyquist)))
+        n_exact = size(steps[0] / m)
+        if n_exact <= min(SPECTRAL_MAX_POINTS, SPECTRAL_EXACT_RATIO * n):
+            return steps[0] / m, next_fast_len(int(np.ceil(n_exact)), real=True), m
+    if n > SPECTRAL_MAX_POINTS:
+        raise ValueError(
+            f"spectral 后端需要 {n:.3g} 个 FFT 点（上限 {SPECTRAL_MAX_POINTS}）：时间窗 "
+            f"[{t_min:.3e}, {t_max:.3e}] s 相对脉冲宽度 {a:.3e} s 过长，请缩小时间窗或改用其它求积后端。"
+        )
+    return h, next_fast_len(int(np.ceil(n)), real=True), 0
+
+
+def _image_tail_sums(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Σ_{k!=0} |x+k|^{-3} 与 Σ_{k!=0} sign(x+k)/(x+k)^2，|x| < 1。
+    最近的镜像 k = ±1 直接求和；其余项为 -[ψ2(2+x) + ψ2(2-x)]/2 与 ψ1(2+x) - ψ1(2-x)，
+    在 [-1, 1] 上光滑，用 129 个节点的三次样条插值（逐点调用多伽马函数很慢）。
+    """
+    from scipy import special
+    from scipy.interpolate import CubicSpline
+
+    nodes = np.linspace(-1.0, 1.0, 129)
+    far_x = -0.5 * (special.polygamma(2, 2.0 + nodes) + special.polygamma(2, 2.0 - nodes))
+    far_z = special.polygamma(1, 2.0 + nodes) - special.polygamma(1, 2.0 - nodes)
+    sum_x = (1.0 + x) ** -3 + (1.0 - x) ** -3 + CubicSpline(nodes, far_x)(x)
+    sum_z = (1.0 + x) ** -2 - (1.0 - x) ** -2 + CubicSpline(nodes, far_z)(x)
+    return sum_x, sum_z
+
+
+def compute_fields_spectral(t_array: np.ndarray, params: SimulationParams) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    频域路径：在 spectral_grid 给出的 FFT 网格上采样 analytic_field_spectra，
+    以 irfft 得到 t_start + j h 处的周期延拓场（周期 P = N h），
+    均匀 t_array 直接抽取网格点，否则三次样条插值；
+    再扣除镜像 t + kP (k != 0) 的主阶尾部，其和为多伽马函数闭式：
+        Σ_{k!=0} |t+kP|^{-3}        = -[ψ2(1+x) + ψ2(1-x)] / (2 P^3)
+        Σ_{k!=0} sign(t+kP)/(t+kP)^2 = [ψ1(1+x) - ψ1(1-x)] / P^2,   x = t/P
+    （见 _image_tail_sums）。B_y = (beta/c) E_x。
+    """
+    t_array = np.asarray(t_array, dtype=float)
+    h, n, m = spectral_grid(t_array, params)
+    t_start = float(t_array[0]) if m else float(t_array.min()) - h
+    omega = 2.0 * np.pi * np.fft.rfftfreq(n, h)
+    band = omega <= spectral_bandwidth(params)   # 带外分量低于 rtol，不必计算 Bessel/Faddeeva 函数
+    E_x_hat = np.zeros(omega.size, dtype=complex)
+    E_z_hat = np.zeros(omega.size, dtype=complex)
+    E_x_hat[band], E_z_hat[band] = analytic_field_spectra(omega[band], params)
+    # E(t_start + j h) = (Δω/sqrt(2π)) Σ_k Ê(ω_k) e^{iω_k t_start} e^{2πi jk/n}，Δω = 2π/(n h)
+    phase = np.exp(1j * omega[band] * t_start) * (np.sqrt(2.0 * np.pi) / h)
+    E_x_hat[band] *= phase
+    E_z_hat[band] *= phase
+    E_x_grid = np.fft.irfft(E_x_hat, n)
+    E_z_grid = np.fft.irfft(E_z_hat, n)
+    if m:
+        idx = m * np.arange(t_array.size)
+        E_x, E_z = E_x_grid[idx], E_z_grid[idx]
+    else:
+        from scipy.interpolate import CubicSpline
+
+        stop = int(np.ceil((float(t_array.max()) - t_start) / h)) + 2
+        t_grid = t_start + h * np.arange(stop)
+        E_x = CubicSpline(t_grid, E_x_grid[:stop])(t_array)
+        E_z = CubicSpline(t_grid, E_z_grid[:stop])(t_array)
+
+    period = n * h
+    image_x, image_z = _image_tail_sums(t_array / period)
+    a = params.t_0 / (params.beta * params.gamma)
+    prefactor = -physics.coulomb_factor(params.N * E_CHARGE) * params.gamma / params.distance**2
+    tail = prefactor * (a / period) ** 3
+    E_x = E_x - tail * image_x
+    E_z = E_z - params.beta * tail * (period / params.t_0) * image_z
+    B_y = params.beta / C_LIGHT * E_x
+    return E_x, E_z, B_y
+
+
+def check_spectral_consistency(
+    t_array: np.ndarray,
+    params: SimulationParams,
+    reference: str = "gauss-hermite",
+) -> dict[str, float]:
+    """
+    spectral 后端与时域求积后端 reference 的一致性检查：
+    返回 E_x, E_z 的最大绝对偏差相对各自峰值，以及两条路径的耗时。
+    """
+    results = {}
+    timings = {}
+    for name in ("spectral", reference):
+        trial = replace(params, quadrature=name)
+        start = time.perf_counter()
+        with result_cache.bypass():
+            results[name] = compute_fields(t_array, trial)
+        timings[name] = time.perf_counter() - start
+    report = {}
+    for label, i in (("E_x", 0), ("E_z", 1)):
+        ref = results[reference][i]
+        report[f"{label}_rel_err"] = float(np.max(np.abs(results["spectral"][i] - ref)) / max(np.max(np.abs(ref)), 1e-300))
+    report["spectral_s"] = timings["spectral"]
+    report[f"{reference}_s"] = timings[reference]
+    return report
+
+
+def compute_field_metrics(t_array: np.ndarray, E_x: np.ndarray, E_z: np.ndarray) -> dict[str, float]:
+    """
+    计算总电场（矢量和）的峰值与 FWHM，方便终端打印。
+    若脉冲没有降到一半幅度，则返回 NaN。
+    """
+    metrics = compute_field_metrics_batch(t_array[None, :], E_x[None, :], E_z[None, :])
+    return {name: float(value[0]) for name, value in metrics.items()}
+
+
+def compute_field_metrics_batch(t_rows: np.ndarray, E_x: np.ndarray, E_z: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    compute_field_metrics 的批量版本：每行一个场景，(n, Nt) 数组一次算完，
+    返回长度为 n 的 E_peak / t_peak / FWHM 数组（无半高交点的行为 NaN）。
+    半高交点为峰值两侧第一个低于半高的采样点与其内侧相邻点之间的线性插值。
+    """
+    t_rows = np.broadcast_to(t_rows, E_x.shape)
+    field_mag = np.sqrt(E_x**2 + E_z**2)
+    n, Nt = field_mag.shape
+    rows = np.arange(n)
+    peak_idx = np.argmax(field_mag, axis=1)
+    E_peak = field_mag[rows, peak_idx]
+    half_level = 0.5 * E_peak
+    below = field_mag < half_level[:, None]
+    cols = np.arange(Nt)[None, :]
+    left_mask = below & (cols <= peak_idx[:, None])
+    right_mask = below & (cols >= peak_idx[:, None])
+    left_idx = Nt - 1 - np.argmax(left_mask[:, ::-1], axis=1)  # 峰值左侧最近的低点
+    right_idx = np.argmax(right_mask, axis=1)                   # 峰值右侧最近的低点
+    has_left = left_mask.any(axis=1) & (left_idx + 1 < Nt)
+    has_right = right_mask.any(axis=1) & (right_idx > 0)
+    left_idx = np.where(has_left, left_idx, 0)
+    right_idx = np.where(has_right, right_idx, 1)
+
+    def _interpolate_cross(idx_low: np.ndarray, idx_high: np.ndarray) -> np.ndarray:
+        """在给定的两个点之间对半高位置做线性插值。"""
+        y0, y1 = field_mag[rows, idx_low], field_mag[rows, idx_high]
+        t0, t1 = t_rows[rows, idx_low], t_rows[rows, idx_high]
+        # 不用 np.isclose：其默认 atol=1e-8 对 B（T 量级很小）会把交点截到采样点上
+        flat = y1 == y0
+        slope = np.where(flat, 1.0, y1 - y0)
+        return np.where(flat, t0, t0 + (half_level - y0) * (t1 - t0) / slope)
+
+    left_time = np.where(has_left, _interpolate_cross(left_idx, left_idx + 1), np.nan)
+    right_time = np.where(has_right, _interpolate_cross(right_idx - 1, right_idx), np.nan)
+    return {
+        "E_peak": E_peak,
+        "t_peak": t_rows[rows, peak_idx],
+        "FWHM": right_time - left_time,
+    }
+
+
+def plot_fields(
+    t_array: np.ndarray,
+    E_x: np.ndarray,
+    E_z: np.ndarray,
+    B_y: np.ndarray,
+    params: SimulationParams,
+    outfile: str = "gaussian_micro.png",
+    show: bool = True,
+) -> None:
+    """绘制电磁场幅值与分量，并保存 PNG。"""
+    field_magnitude = np.sqrt(E_x**2 + E_z**2)
+    magnetic_magnitude = np.abs(B_y)
+
+    dpi = 300
+    plt = pyplot()
+    fig, axes = plt.subplots(2, 2, figsize=(12, 9))
+    ax = axes
+
+    # 左上: 总电场
+    plot_line(ax[0, 0], t_array, field_magnitude, dpi=dpi)
+    ax[0, 0].set_title("电场幅值随时间变化")
+    ax[0, 0].set_xlabel("时间 t（s）")
+    ax[0, 0].set_ylabel("电场强度（V/m）")
+    ax[0, 0].grid(True, linestyle="--", alpha=0.5)
+
+    # 左下: 磁场幅值
+    plot_line(ax[1, 0], t_array, magnetic_magnitude, color="green", dpi=dpi)
+    ax[1, 0].set_title("磁场幅值随时间变化")
+    ax[1, 0].set_xlabel("时间 t（s）")
+    ax[1, 0].set_ylabel("磁场强度（T）")
+    ax[1, 0].grid(True, linestyle="--", alpha=0.5)
+    # 若需对数坐标，可启用下行代码：ax[1, 0].set_yscale("log")
+
+    # 右上: 电场分量
+    plot_line(ax[0, 1], t_array, E_x, label="E_x", color="tab:blue", dpi=dpi)
+    plot_line(ax[0, 1], t_array, E_z, label="E_z", color="tab:red", linestyle="--", dpi=dpi)
+    ax[0, 1].set_title("电场分量随时间变化")
+    ax[0, 1].set_xlabel("时间 t（s）")
+    ax[0, 1].set_ylabel("电场强度（V/m）")
+    ax[0, 1].legend()
+    ax[0, 1].grid(True, linestyle="--", alpha=0.5)
+
+    # 右下: 磁场分量
+    plot_line(ax[1, 1], t_array, B_y, color="purple", dpi=dpi)
+    ax[1, 1].set_title("磁场分量随时间变化")
+    ax[1, 1].set_xlabel("时间 t（s）")
+    ax[1, 1].set_ylabel("磁场强度（T）")
+    ax[1, 1].grid(True, linestyle="--", alpha=0.5)
+
+    fig.suptitle("高斯微束时变电磁场模拟", fontsize=16)
+    annotation = (
+        f"N = {params.N:.2e}\n"
+        f"Ek = {params.Ek_MeV:.2f} MeV\n"
+        f"tau_0 = {params.tau_0*1e12:.1f} ps\n"
+        f"d = {params.distance:.2f} m"
+    )
+    ax[0, 0].text(
+        0.98,
+        0.95,
+        annotation,
+        transform=ax[0, 0].transAxes,
+        ha="right",
+        va="top",
+        bbox=dict(boxstyle="round", facecolor="white", alpha=0.7),
+    )
+
+    plt.tight_layout(rect=[0, 0, 1, 0.97])
+    plt.savefig(outfile, dpi=dpi, bbox_inches="tight")
+    print(f"[信息] 图像已保存至 {outfile}")
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def plot_frequency_spectrum(
+    freq_array: np.ndarray,
+    spectrum: np.ndarray,
+    outfile: str = "gaussian_micro_freq.png",
+    show: bool = True,
+) -> None:
+    """绘制频域电场谱，横轴为频率 f。"""
+    dpi = 300
+    plt = pyplot()
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.set_xscale("log")
+    plot_line(ax, freq_array, np.abs(spectrum), dpi=dpi)
+    ax.set_xlim(freq_array.min(), freq_array.max())
+    ax.set_title("频域电场谱 |E~(f)|")
+    ax.set_xlabel("频率 f（Hz）")
+    ax.set_ylabel("幅值（V/m）")
+    ax.grid(True, linestyle="--", alpha=0.5)
+    plt.tight_layout()
+    plt.savefig(outfile, dpi=dpi, bbox_inches="tight")
+    print(f"[信息] 频域图像已保存至 {outfile}")
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Gaussian micro-pulse EM field calculator.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--N", type=float, default=1e10, help="电子数量")
+    parser.add_argument("--Ek", type=float, default=10.0, help="束流动能 (MeV)")
+    parser.add_argument("--tau0", type=float, default=100e-12, help="脉冲宽度 tau_0 (s)")
+    parser.add_argument("--d", type=float, default=1.0, help="观测距离 d (m)")
+    parser.add_argument("--Nt", type=int, default=2001, help="时间采样点数")
+    parser.add_argument("--Ntau", type=int, default=2001, help="tau 积分采样点数")
+    parser.add_argument("--tmin", type=float, default=-1e-9, help="时间范围下限 (s)")
+    parser.add_argument("--tmax", type=float, default=1e-9, help="时间范围上限 (s)")
+    parser.add_argument("--outfile", type=str, default="gaussian_micro.png", help="输出 PNG 名称")
+    parser.add_argument("--Nf", type=int, default=1000, help="频域采样点数")
+    parser.add_argument("--fmin", type=float, default=1e3, help="频率范围下限 (Hz)")
+    parser.add_argument("--fmax", type=float, default=1e10, help="频率范围上限 (Hz)")
+    parser.add_argument(
+        "--quadrature",
+        type=str,
+        default="simpson",
+        choices=QUADRATURE_BACKENDS,
+        help="tau 积分后端（spectral: 解析频谱 + 逆 FFT，长时间窗/密采样时最快）",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=float,
+        default=MAX_MEMORY_DEFAULT,
+        help="工作缓冲内存上限 (bytes)，例如 5e8",
+    )
+    parser.add_argument("--rtol", type=float, default=1e-8, help="gauss-hermite / adaptive / spectral 目标相对误差")
+    parser.add_argument(
+        "--check-spectral",
+        action="store_true",
+        help="比较 spectral 后端与 gauss-hermite 时域求积，打印 E_x/E_z 的最大偏差（相对峰值）与耗时",
+    )
+    parser.add_argument(
+        "--adaptive-time",
+        action="store_true",
+        help="自适应非均匀时间网格：在脉冲附近加密、尾部对数稀疏采样（忽略 --Nt）",
+    )
+    parser.add_argument(
+        "--time-rtol",
+        type=float,
+        default=time_grid.RTOL_DEFAULT,
+        help="自适应时间网格的局部插值误差（相对峰值）",
+    )
+    parser.add_argument(
+        "--converge",
+        type=float,
+        default=None,
+        metavar="TOL",
+        help="自动选择 Ntau / Nt（Richardson 加密），使电场峰值与 FWHM 的相对误差小于 TOL；覆盖 --Nt/--Ntau（不能与 --adaptive-time 同用），按参数区间缓存网格选择，复用时复核一次",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="不读写磁盘结果缓存，全部重新计算")
+    parser.add_argument("--outfreq", type=str, default="gaussian_micro_freq.png", help="频域 PNG 名称")
+    parser.add_argument("--no-plot", action="store_true", help="不绘图（不导入 matplotlib，不调用 plt.show），适用于批处理")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="结果文件 (.npz / .h5)：时间轴、场分量、频谱与参数；可用 python -m ebeamsgemp.render 重新绘图",
+    )
+    args = parser.parse_args(argv)
+    if args.converge and args.adaptive_time:
+        parser.error("--converge 选择均匀网格，不能与 --adaptive-time 同时使用")
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.no_cache:
+        result_cache.set_enabled(False)
+    params = SimulationParams(
+        N=args.N,
+        Ek_MeV=args.Ek,
+        tau_0=args.tau0,
+        distance=args.d,
+        Nt=args.Nt,
+        Ntau=args.Ntau,
+        t_min=args.tmin,
+        t_max=args.tmax,
+        Nf=args.Nf,
+        f_min=args.fmin,
+        f_max=args.fmax,
+        quadrature=args.quadrature,
+        rtol=args.rtol,
+        max_memory=args.max_memory,
+    )
+
+    if args.converge:
+        from .convergence import converge_gaussian_micro
+
+        result = converge_gaussian_micro(params, args.converge, use_cache=not args.no_cache)
+        print("[信息] " + result.report())
+        params = replace(params, **result.grid)
+
+    print("[信息] 关键参数设定：")
+    print(
+        f"    N = {params.N:.3e}, Ek = {params.Ek_MeV:.3f} MeV, "
+        f"tau_0 = {params.tau_0:.3e} s, d = {params.distance:.2f} m"
+    )
+    print(
+        f"    gamma = {params.gamma:.6f}, beta = {params.beta:.6f}, "
+        f"Nt = {params.Nt}, Ntau = {params.Ntau}, quadrature = {params.quadrature}"
+    )
+    rows, n_chunks = chunk_layout(params.Nt, params)
+    if n_chunks > 1:
+        print(
+            f"    按内存上限 {params.max_memory / 1024**2:.1f} MB 分块计算，"
+            f"每块 {rows} 个时间点，共 {n_chunks} 块"
+        )
+
+    start = time.perf_counter()
+    if args.adaptive_time:
+        t_array, E_x, E_z, B_y = build_adaptive_time_grid(params, args.time_rtol)
+        print(f"[信息] 自适应时间网格：{t_array.size} 个采样点")
+    else:
+        t_array = np.linspace(params.t_min, params.t_max, params.Nt)
+        E_x, E_z, B_y = compute_fields(t_array, params)
+    elapsed = time.perf_counter() - start
+    print(f"[信息] 计算完成，耗时 {elapsed:.2f} s")
+
+    if args.check_spectral:
+        check = check_spectral_consistency(t_array, params)
+        print(
+            "[信息] spectral / gauss-hermite 一致性："
+            f"E_x 偏差 {check['E_x_rel_err']:.2e}, E_z 偏差 {check['E_z_rel_err']:.2e}（相对峰值），"
+            f"耗时 {check['spectral_s']:.3f} s / {check['gauss-hermite_s']:.3f} s"
+        )
+
+    metrics = compute_field_metrics(t_array, E_x, E_z)
+    print(
+        "[信息] 电场峰值/半高宽: "
+        f"E_peak = {metrics['E_peak']:.3e} V/m, "
+        f"t_peak = {metrics['t_peak']*1e12:.3f} ps, "
+        f"FWHM = {metrics['FWHM']*1e12:.3f} ps"
+    )
+
+    freq_min = max(params.f_min, 1e-9)
+    if params.f_max <= freq_min:
+        freq_array = np.array([freq_min])
+    else:
+        freq_array = np.logspace(
+            np.log10(freq_min),
+            np.log10(params.f_max),
+            params.Nf,
+        )
+    spectrum = compute_frequency_spectrum(freq_array, params)
+
+    if args.output:
+        save_results(
+            args.output,
+            "gaussian_micro",
+            {"t": t_array, "E_x": E_x, "E_z": E_z, "B_y": B_y, "freq": freq_array, "spectrum": spectrum},
+            {**asdict(params), **metrics},
+        )
+        print(f"[信息] 结果已保存至 {args.output}")
+    if args.no_plot:
+        return
+    plot_fields(t_array, E_x, E_z, B_y, params, outfile=args.outfile)
+    plot_frequency_spectrum(freq_array, spectrum, outfile=args.outfreq)
+
+
+if __name__ == "__main__":
+    main()
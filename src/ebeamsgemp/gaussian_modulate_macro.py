@@ -0,0 +1,223 @@
+import numpy as np
+
+from . import line_spectrum, physics, result_cache
+from .bessel_table import xk1
+from .dirichlet import dirichlet_sum
+from .freq_grid import line_frequency_grid
+from .plotting import plot_line, pyplot
+from .results import save_results
+
+# 物理常数（全包共用，见 physics.py）
+e = physics.E_CHARGE
+epsilon_0 = physics.EPSILON_0
+c = physics.C_LIGHT
+
+# 参数与默认值
+N = 1e10        # 电子数
+Ek = 10      # 10 MeV
+gamma, beta, _ = physics.lorentz_factors(Ek)
+tau_0 = 100e-12
+d = 1.0
+t_0 = physics.transit_time(d)
+T = 550e-12
+macro_duration = 1e-6
+k_max = int(macro_duration / (2*T))
+use_line_grid = True  # 在各谐波线附近加密的非均匀频率网格；False 则用 10 万点均匀网格
+
+@result_cache.cached()
+def compute_micro_spectrum(omega, params):
+    """
+    计算调制微脉冲频域电场 E_modualte_x(omega)
+    
+    参数:
+    omega: 角频率数组
+    params: 参数字典，包含 N, e, gamma, epsilon_0, d, tau_0, t_0, beta
+    
+    返回:
+    E_micro: 微脉冲频域电场数组
+    """
+    N_val = params['N']
+    e_val = params['e']
+    gamma_val = params['gamma']
+    epsilon_0_val = params['epsilon_0']
+    d_val = params['d']
+    tau_0_val = params['tau_0']
+    t_0_val = params['t_0']
+    beta_val = params['beta']
+    
+    # 计算微脉冲频域电场
+    prefactor = -N_val * e_val * gamma_val / (4 * np.pi * epsilon_0_val * d_val**2)
+    gaussian_term = np.exp(-omega**2 * tau_0_val**2 / 4)
+    # ω t0²/(βγ)² · K1(ω t0/(βγ)) = (t0/(βγ)) · x K1(x)，x K1(x) 取自全进程共享的插值表（ω=0 处有限）
+    k1_scale = t_0_val / (beta_val * gamma_val)
+    bessel_term = np.sqrt(2 / np.pi) * k1_scale
+    bessel_xk1 = xk1(omega * k1_scale)
+    
+    E_micro = prefactor * gaussian_term * bessel_term * bessel_xk1
+    return E_micro
+
+@result_cache.cached()
+def compute_macro_spectrum(omega, E_micro, T, k_max, dtype="float64"):
+    """
+    Compute the macro-pulse frequency-domain field E_x(omega).
+    
+    Args:
+    omega: angular frequency array
+    E_micro: micro-pulse spectrum
+    T: micro-pulse spacing
+    k_max: maximum pulse index
+    dtype: "float64" or "float32" (halves memory on very large grids)
+    
+    Returns:
+    E_macro: macro-pulse spectrum
+    F: interference factor array
+    """
+    # one fused pass over the carrier and the +/- pi/(2T) sidebands
+    omega_offset = np.pi / (2 * T)
+    F = dirichlet_sum(omega, T, k_max, offsets=(0.0, omega_offset, -omega_offset), dtype=dtype)
+
+    E_macro = np.multiply(E_micro, F, dtype=F.dtype)
+    return E_macro, F
+
+def compute_harmonic_lines(params, f_min, f_max, T, k_max):
+    """
+    解析计算宏脉冲谱线表（谐波 n/T 及 ±1/(4T) 调制边带），无需稠密频率采样
+
+    参数:
+    params: 参数字典（同 compute_micro_spectrum）
+    f_min, f_max: 频率范围 (Hz)
+    T: 微脉冲间隔
+    k_max: 最大k值
+
+    返回:
+    lines: 按频率排序的谱线表 dict，含 freq, harmonic, sideband,
+           amplitude（线心 |E_macro|）, width（-3 dB 全宽）, energy（谱线积分 |E_macro|^2）
+    """
+    return line_spectrum.compute_line_spectrum(
+        lambda omega: compute_micro_spectrum(omega, params),
+        f_min, f_max, T, k_max,
+        offsets=(0.0, 1 / (4 * T), -1 / (4 * T)),
+    )
+
+def plot_spectra(f, E_micro, E_macro, output_file='modulate_macro_spectrum.png', show=True):
+    """
+    绘制微脉冲和宏脉冲频谱
+    
+    参数:
+    f: 频率数组 (Hz)
+    E_micro: 微脉冲频域电场
+    E_macro: 宏脉冲频域电场
+    output_file: 输出文件名
+    show: 是否调用 plt.show()（批处理/重新绘图时关闭）
+    """
+    dpi = 300
+    plt = pyplot()
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
+    
+    # 图1: 微脉冲频谱
+    ax1.set_xscale('log')
+    plot_line(ax1, f, np.abs(E_micro), 'b-', linewidth=1.5, label='微脉冲频谱', dpi=dpi)
+    ax1.set_xlabel('频率 f (Hz)')
+    ax1.set_ylabel('幅值 |E(ω)|')
+    ax1.set_title('微脉冲频域电场幅值')
+    ax1.grid(True, alpha=0.3)
+    ax1.legend()
+    # ax1.set_yscale('log')
+    
+    # 图2: 宏脉冲频谱
+    ax2.set_xscale('log')
+    plot_line(ax2, f, np.abs(E_macro), 'r-', linewidth=1.5, label='宏脉冲频谱', dpi=dpi)
+    ax2.set_xlabel('频率 f (Hz)')
+    ax2.set_ylabel('幅值 |E(ω)|')
+    ax2.set_title('宏脉冲电场频谱（1 微秒宏脉冲，T=550 ps）')
+    ax2.grid(True, alpha=0.3)
+    ax2.legend()
+    # ax2.set_yscale('log')
+    
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
+
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="按默认参数计算微/宏脉冲频谱并绘图",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--outfile", type=str, default="modulate_spectrum.png", help="输出图片文件名")
+    parser.add_argument("--no-plot", action="store_true", help="不绘图（不导入 matplotlib，不调用 plt.show），适用于批处理")
+    parser.add_argument("--output", type=str, default=None,
+                        help="结果文件 (.npz / .h5)：频率、频谱、谱线表与参数；可用 python -m ebeamsgemp.render 重新绘图")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """按默认参数计算微/宏脉冲频谱并绘图"""
+    args = parse_args(argv)
+    # 1. 初始化参数
+    params = {
+        'N': N,
+        'e': e,
+        'gamma': gamma,
+        'epsilon_0': epsilon_0,
+        'd': d,
+        'tau_0': tau_0,
+        't_0': t_0,
+        'beta': beta
+    }
+    
+    print(f"参数设置:")
+    print(f"电子数 N = {N:.2e}")
+    print(f"能量 Ek = {Ek/1e6:.1f} MeV")
+    print(f"洛伦兹因子 gamma = {gamma:.6f}")
+    print(f"速度比 beta = {beta:.6f}")
+    print(f"微脉冲间隔 T = {T:.2e} s")
+    print(f"宏脉冲持续时间 = {macro_duration:.2e} s")
+    print(f"k_max = {k_max}")
+    
+    # 2. 生成频率数组
+    f_max = 3e10  # 30 GHz
+    if use_line_grid:
+        # 谱线 n/T（含 ±1/(4T) 调制边带）处精确取样，线间稀疏
+        f = line_frequency_grid(1e8, f_max, T, k_max, offsets=(0.0, 1 / (4 * T), -1 / (4 * T)))
+    else:
+        f = np.linspace(1e8, f_max, 100000)  # 从1MHz开始避免零频率问题
+    Nw = f.size
+    omega = 2 * np.pi * f
+    
+    print(f"\n频率范围: {f[0]/1e6:.2f} MHz 到 {f[-1]/1e9:.2f} GHz")
+    print(f"频率点数: {Nw}")
+    
+    # 3. 计算调制微脉冲频谱
+    E_micro = compute_micro_spectrum(omega, params)
+    print("调制微脉冲频谱计算完成")
+    
+    # 4. 计算宏脉冲频谱
+    E_macro, F = compute_macro_spectrum(omega, E_micro, T, k_max)
+    print("宏脉冲频谱计算完成")
+
+    lines = compute_harmonic_lines(params, 1e8, f_max, T, k_max)
+    strongest = int(np.argmax(lines["amplitude"]))
+    print(f"谱线数: {lines['freq'].size}，最强谱线 {lines['freq'][strongest]/1e9:.4f} GHz，"
+          f"|E| = {lines['amplitude'][strongest]:.4e}，-3 dB 线宽 {lines['width'][0]/1e6:.3f} MHz")
+    
+    if args.output:
+        save_results(
+            args.output,
+            "gaussian_modulate_macro",
+            {"f": f, "E_micro": E_micro, "E_macro": E_macro,
+             **{f"line_{key}": value for key, value in lines.items() if np.ndim(value) == 1}},
+            {"N": N, "Ek_MeV": Ek, "tau_0": tau_0, "d": d, "T": T,
+             "macro_duration": macro_duration, "k_max": k_max},
+        )
+        print(f"结果已保存为 {args.output}")
+
+    # 5. 绘图保存
+    if not args.no_plot:
+        plot_spectra(f, E_micro, E_macro, args.outfile)
+        print(f"图像已保存为 {args.outfile}")
+
+if __name__ == "__main__":
+    main()
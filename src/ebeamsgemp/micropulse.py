@@ -0,0 +1,828 @@
+#!/usr/bin/env python3
+"""
+micropulse.py
+==============
+
+Numerically evaluate the time-domain electric and magnetic fields generated by a
+uniform, rigidly moving 1D electron beam bunch (micropulse) at a fixed
+observation point. The implementation follows the prompt-specified formulas:
+
+    E(z', t) = -lambda/(4*pi*epsilon_0) * (1 - beta^2)
+               / (1 - beta^2 * sin^2(theta))^(3/2) * (R_hat / R^2)
+    B(z', t) = (1/c^2) * v x E
+
+with z' in [-v0 * tau0, v0 * tau0] and observation point at (d, 0, 0).
+The z' integral is a cross-correlation of the bunch profile with the
+single-charge pulse; it can be evaluated by direct quadrature (``trapz``), by
+FFT correlation (``fft``) or in closed form for the uniform bunch (``analytic``).
+
+Running ``python -m ebeamsgemp.micropulse`` prints diagnostics (beta, gamma, v0, lambda,
+grid sizes, peak fields, runtime) and saves ``micropulse_EM_field.png``; with
+``--no-plot --output results.npz`` it writes the fields instead and never
+imports matplotlib (redraw later with ``python -m ebeamsgemp.render``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import physics, result_cache, time_grid
+from .physics import C_LIGHT as c, E_CHARGE as elementary_charge, EPSILON_0 as epsilon_0
+from .plotting import plot_line, pyplot
+from .results import save_results
+
+# -----------------------------------------------------------------------------
+# Global configuration defaults (modifiable by user or CLI)
+# -----------------------------------------------------------------------------
+D_DEFAULT = 1.0  # m
+E_K_EV_DEFAULT = 10.0e6  # electron kinetic energy in eV
+N_ELECTRONS_DEFAULT = 1.0e10
+TAU0_DEFAULT = 100e-12  # 100 ps
+REALISTIC_SPAN_MULTIPLIER = 10.0  # default time window: +/- 5 * tau0
+T_MIN_PROMPT = -1.0e8  # s (extreme span from prompt)
+T_MAX_PROMPT = 1.0e8   # s
+NT_DEFAULT = 2000
+NZ_DEFAULT = 4000
+BATCH_T_SIZE_DEFAULT = None  # time samples per batch (None: size from MAX_MEMORY_DEFAULT)
+MAX_MEMORY_DEFAULT = 256.0 * 1024**2  # bytes of (batch, Nz) work arrays
+BATCH_WORK_ARRAYS = 6  # 4 preallocated buffers + 2 np.trapz temporaries
+ENGINE_DEFAULT = "trapz"  # field integration engine
+FIELD_ENGINES = ("trapz", "fft", "analytic")
+FFT_MAX_POINTS = 1 << 23  # cap on the fine correlation grid of the FFT engine
+FFT_KERNEL_STEP = 0.05  # FFT engine grid step, in units of the kernel width d / (gamma * v0)
+SAVE_PLOTS_DEFAULT = True
+USE_REALISTIC_SPAN_DEFAULT = True  # default to +/- 5 tau0 unless overridden
+SMALL_EPS = 1.0e-20
+
+# User-editable parameters (can be tweaked without touching the rest of the code)
+d = D_DEFAULT
+E_k_eV = E_K_EV_DEFAULT
+N_electrons = N_ELECTRONS_DEFAULT
+tau0 = TAU0_DEFAULT
+t_min_default = T_MIN_PROMPT
+t_max_default = T_MAX_PROMPT
+Nt_config = NT_DEFAULT
+Nz_config = NZ_DEFAULT
+save_plots_default = SAVE_PLOTS_DEFAULT
+use_realistic_t_span = USE_REALISTIC_SPAN_DEFAULT
+batch_t_size = BATCH_T_SIZE_DEFAULT
+max_memory_config = MAX_MEMORY_DEFAULT
+workers_config = 1
+engine_config = ENGINE_DEFAULT
+
+
+# -----------------------------------------------------------------------------
+# Helper utilities
+# -----------------------------------------------------------------------------
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse CLI options that override default simulation settings."""
+    parser = argparse.ArgumentParser(
+        description="Compute EM fields from a uniform electron micropulse."
+    )
+    parser.add_argument("--Nt", type=int, default=None, help="number of time samples")
+    parser.add_argument("--Nz", type=int, default=None, help="number of z' samples")
+    parser.add_argument("--t-min", type=float, default=None, help="custom start time (s)")
+    parser.add_argument("--t-max", type=float, default=None, help="custom end time (s)")
+    parser.add_argument(
+        "--use-extreme-span",
+        action="store_true",
+        help="use the prompt-specified +/-1e8 s time window instead of +/-5*tau0",
+    )
+    parser.add_argument(
+        "--adaptive-time",
+        action="store_true",
+        help="cluster time samples where the field varies (non-uniform grid, ignores --Nt)",
+    )
+    parser.add_argument(
+        "--time-rtol",
+        type=float,
+        default=time_grid.RTOL_DEFAULT,
+        help="local interpolation tolerance of the adaptive time grid (relative to peak)",
+    )
+    parser.add_argument(
+        "--converge",
+        type=float,
+        default=None,
+        metavar="TOL",
+        help=(
+            "choose Nz and Nt automatically (Richardson refinement) so that peak |E| and FWHM "
+            "are stable to this relative tolerance; overrides --Nt/--Nz (not with --adaptive-time), grid choices "
+            "are cached per regime and re-verified on reuse"
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="number of time samples processed per batch (default: sized from --max-memory)",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=float,
+        default=None,
+        help="memory budget in bytes for the per-batch work arrays (e.g. 5e8)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="threads used for the trapz time batches",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=FIELD_ENGINES,
+        default=None,
+        help=(
+            "field integration engine (trapz: direct quadrature, fft: FFT correlation, "
+            "analytic: closed form for the uniform bunch)"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="recompute fields instead of reading/writing the on-disk result cache",
+    )
+    parser.add_argument(
+        "--no-save-plots",
+        action="store_true",
+        help="skip saving PNG files (plots are still generated if interactive)",
+    )
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="do not build figures at all (matplotlib is never imported); for batch jobs",
+    )
+    parser.add_argument("--show", action="store_true", help="also open the figure interactively")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="write times, fields and parameters to a .npz/.h5 file (redraw with ebeamsgemp.render)",
+    )
+    args = parser.parse_args(argv)
+    if args.converge and args.adaptive_time:
+        parser.error("--converge picks a uniform grid; it cannot be combined with --adaptive-time")
+    return args
+
+
+def ensure_odd(count: int) -> int:
+    """Ensure the sample count is odd so that t = 0 is included."""
+    return count if count % 2 == 1 else count + 1
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Human-readable memory estimate."""
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if num_bytes < 1024.0:
+            return f"{num_bytes:.2f} {unit}"
+        num_bytes /= 1024.0
+    return f"{num_bytes:.2f} PB"
+
+
+def estimate_batch_memory(batch_size: int, nz: int) -> str:
+    """
+    Rough estimate of memory needed for intermediate arrays (float64).
+    We anticipate ~6 arrays of size (batch, nz).
+    """
+    bytes_est = batch_size * nz * 8.0 * BATCH_WORK_ARRAYS
+    return format_bytes(bytes_est)
+
+
+def auto_batch_size(
+    nz: int, max_memory: float = MAX_MEMORY_DEFAULT, nt: Optional[int] = None, workers: int = 1
+) -> int:
+    """
+    Largest time batch whose (batch, nz) work arrays fit into max_memory bytes.
+
+    With workers > 1 the budget is split between the workers (each keeps its
+    own buffers) and, given ``nt``, the batch is capped so every worker gets one.
+    """
+    workers = max(workers, 1)
+    batch_size = max(1, int(max_memory / workers // (nz * 8.0 * BATCH_WORK_ARRAYS)))
+    if nt is not None:
+        batch_size = min(batch_size, -(-nt // workers))
+    return batch_size
+
+
+def choose_time_axis(times: np.ndarray) -> Tuple[np.ndarray, str]:
+    """
+    Pick an appropriate time unit for plotting and return scaled time array
+    along with the axis label.
+    """
+    max_abs = np.max(np.abs(times)) if times.size else 1.0
+    if max_abs < 1e-9:
+        return times * 1e12, "Time (ps)"
+    if max_abs < 1e-6:
+        return times * 1e9, "Time (ns)"
+    if max_abs < 1e-3:
+        return times * 1e6, "Time (us)"
+    if max_abs < 1.0:
+        return times * 1e3, "Time (ms)"
+    return times, "Time (s)"
+
+
+def annotate_peak(ax, times, data, color: str, label: str) -> None:
+    """Mark the absolute-value peak on the provided axis."""
+    idx = int(np.argmax(np.abs(data)))
+    ax.scatter(times[idx], data[idx], color=color, s=30, zorder=5)
+    ax.annotate(
+        f"{label} peak = {data[idx]:.2e}",
+        xy=(times[idx], data[idx]),
+        xytext=(5, 10),
+        textcoords="offset points",
+        color=color,
+        fontsize=9,
+    )
+
+
+def compute_fwhm(times: np.ndarray, signal: np.ndarray) -> Tuple[float, float]:
+    """Return FWHM duration (seconds) and half-maximum value."""
+    if len(times) < 2 or signal.size == 0:
+        return 0.0, 0.0
+    half_max = 0.5 * np.max(signal)
+    if half_max <= 0:
+        return 0.0, half_max
+    steps = np.diff(times)
+    if np.allclose(steps, steps[0], rtol=1e-6, atol=0.0):
+        dt = abs(times[1] - times[0])
+        duration = np.sum(signal >= half_max) * dt
+    else:
+        # non-uniform (adaptive) grid: each sample owns half of its neighbouring steps
+        cells = np.zeros(len(times))
+        cells[:-1] += 0.5 * np.abs(steps)
+        cells[1:] += 0.5 * np.abs(steps)
+        duration = np.sum(cells[signal >= half_max])
+    return duration, half_max
+
+
+# -----------------------------------------------------------------------------
+# Physics helpers
+# -----------------------------------------------------------------------------
+def compute_gamma_beta_v0(E_k_eV: float) -> Tuple[float, float, float]:
+    """Compute relativistic gamma, beta, and v0 from kinetic energy (eV)."""
+    return physics.lorentz_factors(E_k_eV * 1e-6)
+
+
+def compute_line_charge_density(N_electrons: float, v0: float, tau0: float) -> float:
+    """
+    Uniform line charge density within the bunch window.
+    Negative sign accounts for electron charge.
+    """
+    return -elementary_charge * N_electrons / (2.0 * v0 * tau0)
+
+
+# -----------------------------------------------------------------------------
+# Field integration
+# -----------------------------------------------------------------------------
+def point_charge_kernel(
+    rz: np.ndarray, beta: float, d: float, lam: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ex/Ez contributions per unit z' of a line element at axial offset ``rz``
+    (z' + v0 * t) from the observer plane.
+    """
+    pref_const = -lam / (4.0 * math.pi * epsilon_0)
+    geom_factor = (1.0 - beta * beta)
+    r2 = d * d + rz * rz + SMALL_EPS
+    r = np.sqrt(r2)
+    sin_sq = (d * d) / r2
+    denom = np.power(1.0 - beta * beta * sin_sq, 1.5) + SMALL_EPS
+    prefactor = pref_const * geom_factor / denom
+    r3 = r2 * r + SMALL_EPS
+    return prefactor * d / r3, prefactor * rz / r3
+
+
+def linear_quadrature_weights(a: float, b: float, h: float) -> Tuple[np.ndarray, int]:
+    """
+    Weights on the nodes k*h that integrate the piecewise-linear interpolant of a
+    function over [a, b]. Returns (weights, k_first) where weights[j] belongs to
+    node (k_first + j) * h. Equivalent to np.trapz when a and b fall on nodes.
+    """
+    k_lo = int(math.floor(a / h))
+    k_hi = max(int(math.ceil(b / h)), k_lo + 1)
+    x_left = np.arange(k_lo, k_hi) * h
+    p = np.maximum(a, x_left)
+    q = np.minimum(b, x_left + h)
+    length = np.maximum(q - p, 0.0)
+    mid = 0.5 * (p + q)
+    weights = np.zeros(k_hi - k_lo + 1)
+    weights[:-1] += length * (x_left + h - mid) / h
+    weights[1:] += length * (mid - x_left) / h
+    return weights, k_lo
+
+
+def cubic_quadrature_weights(a: float, b: float, h: float) -> Tuple[np.ndarray, int]:
+    """
+    Weights on the nodes k*h that integrate the piecewise-cubic interpolant of a
+    function over [a, b] (on each cell, the cubic through the four nearest
+    nodes); fourth order in h, and a and b need not fall on nodes. Returns
+    (weights, k_first) like ``linear_quadrature_weights``.
+    """
+    k_lo = int(math.floor(a / h))
+    k_hi = max(int(math.ceil(b / h)), k_lo + 1)
+    x_left = np.arange(k_lo, k_hi) * h
+    p = np.maximum(a, x_left)
+    q = np.minimum(b, x_left + h)
+    half = 0.5 * np.maximum(q - p, 0.0)
+    weights = np.zeros(k_hi - k_lo + 3)  # nodes k_lo - 1 .. k_hi + 1
+    cell = np.arange(k_hi - k_lo)
+    # 2-point Gauss-Legendre per cell is exact for the cubic interpolant
+    for node in (-1.0 / math.sqrt(3.0), 1.0 / math.sqrt(3.0)):
+        theta = (0.5 * (p + q) + half * node - x_left) / h  # position in the cell, 0..1
+        basis = (
+            -theta * (theta - 1.0) * (theta - 2.0) / 6.0,
+            (theta + 1.0) * (theta - 1.0) * (theta - 2.0) / 2.0,
+            -(theta + 1.0) * theta * (theta - 2.0) / 2.0,
+            (theta + 1.0) * theta * (theta - 1.0) / 6.0,
+        )
+        for offset, value in enumerate(basis):
+            weights[cell + offset] += half * value
+    return weights, k_lo - 1
+
+
+def _trapz_batch(
+    t_batch: np.ndarray,
+    z_prime: np.ndarray,
+    beta: float,
+    v0: float,
+    d: float,
+    lam: float,
+    work: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Integrate one time batch in place. ``work`` is a (4, >=batch, Nz) scratch
+    array; the arithmetic mirrors ``point_charge_kernel`` operation for
+    operation, so results are identical to the allocating version.
+    """
+    n = len(t_batch)
+    rz, a, b, c = (buf[:n] for buf in work)
+    pref = (-lam / (4.0 * math.pi * epsilon_0)) * (1.0 - beta * beta)
+
+    np.add(z_prime[None, :], v0 * t_batch[:, None], out=rz)
+    np.multiply(rz, rz, out=a)
+    a += d * d
+    a += SMALL_EPS  # a = r^2
+    np.sqrt(a, out=b)
+    np.multiply(a, b, out=b)
+    b += SMALL_EPS  # b = r^3
+    np.divide(d * d, a, out=c)
+    c *= beta * beta
+    np.subtract(1.0, c, out=c)
+    np.power(c, 1.5, out=c)
+    c += SMALL_EPS
+    np.divide(pref, c, out=c)  # c = prefactor
+    np.multiply(c, d, out=a)
+    a /= b  # a = Ex density
+    np.multiply(c, rz, out=c)
+    c /= b  # c = Ez density
+    return np.trapz(a, z_prime, axis=1), np.trapz(c, z_prime, axis=1)
+
+
+def _integrate_trapz(
+    times: np.ndarray,
+    z_prime: np.ndarray,
+    beta: float,
+    v0: float,
+    d: float,
+    lam: float,
+    batch_size: int,
+    workers: int = 1,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Direct quadrature over z' for batches of time samples, O(Nt * Nz).
+
+    With workers > 1 the batches are dispatched to a thread pool (NumPy
+    releases the GIL in the heavy ufuncs). Every thread keeps its own scratch
+    buffers and writes into disjoint slices of the outputs, so the result is
+    bit-identical to the serial loop.
+    """
+    Nt = len(times)
+    ex = np.zeros(Nt)
+    ez = np.zeros(Nt)
+    work_shape = (4, min(batch_size, Nt), len(z_prime))
+
+    if workers <= 1:
+        work = np.empty(work_shape)
+        for start in range(0, Nt, batch_size):
+            stop = min(start + batch_size, Nt)
+            ex[start:stop], ez[start:stop] = _trapz_batch(
+                times[start:stop], z_prime, beta, v0, d, lam, work
+            )
+        return ex, ez
+
+    scratch = threading.local()
+
+    def run_batch(start: int) -> None:
+        work = getattr(scratch, "work", None)
+        if work is None:
+            work = scratch.work = np.empty(work_shape)
+        stop = min(start + batch_size, Nt)
+        ex[start:stop], ez[start:stop] = _trapz_batch(
+            times[start:stop], z_prime, beta, v0, d, lam, work
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # list() re-raises any exception from the workers
+        list(pool.map(run_batch, range(0, Nt, batch_size)))
+    return ex, ez
+
+
+def _integrate_fft(
+    times: np.ndarray,
+    z_prime: np.ndarray,
+    beta: float,
+    v0: float,
+    d: float,
+    lam: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cross-correlate the bunch window with the single-charge kernel via FFT.
+
+    The kernel is sampled on the output grid itself (step h = dt), refined to
+    h = dt / m only when dt does not resolve its width d / (gamma * v0)
+    (h <= FFT_KERNEL_STEP of it). The bunch window becomes the weights of the
+    piecewise-cubic interpolant on that grid (cubic_quadrature_weights), so
+    the bunch ends need not fall on nodes and only the end points of
+    ``z_prime`` are used. For m > 1 the correlation is split into m polyphase
+    components, so only the requested outputs are computed. Cost is
+    O((m * Nt + L) log) with L ~ 2 tau0 / h taps, O((Nt + L) log) on
+    resolving time grids.
+    """
+    from scipy.signal import fftconvolve  # deferred: heavy import, fft engine only
+
+    Nt = len(times)
+    gamma = 1.0 / math.sqrt(1.0 - beta * beta)
+    h_max = FFT_KERNEL_STEP * d / (gamma * v0)
+    if Nt > 1:
+        dt = (times[-1] - times[0]) / (Nt - 1)
+        if not np.allclose(np.diff(times), dt, rtol=1e-6, atol=0.0):
+            raise ValueError("engine='fft' requires uniformly spaced times.")
+        m = max(1, int(math.ceil(dt / h_max - 1e-9)))
+        h = dt / m
+    else:
+        m, h = 1, h_max
+
+    weights, k_first = cubic_quadrature_weights(z_prime[0] / v0, z_prime[-1] / v0, h)
+    n_grid = (Nt - 1) * m + len(weights)
+    if n_grid > FFT_MAX_POINTS:
+        raise ValueError(
+            f"FFT correlation grid needs {n_grid} points (limit {FFT_MAX_POINTS}); "
+            "reduce the time span or use engine='trapz'."
+        )
+
+    s_grid = times[0] + (k_first + np.arange(n_grid)) * h
+    kx, kz = point_charge_kernel(v0 * s_grid, beta, d, lam)
+    taps = v0 * weights
+    ex = np.zeros(Nt)
+    ez = np.zeros(Nt)
+    # out[j] = sum_i taps[i] k[j*m + i] = sum_p sum_q taps[q*m + p] k_p[j + q], k_p = k[p::m]
+    for phase in range(min(m, len(taps))):
+        reversed_taps = taps[phase::m][::-1]  # correlation = convolution with reversed taps
+        ex += fftconvolve(kx[phase::m], reversed_taps, mode="valid")[:Nt]
+        ez += fftconvolve(kz[phase::m], reversed_taps, mode="valid")[:Nt]
+    return ex, ez
+
+
+def _integrate_analytic(
+    times: np.ndarray,
+    z_prime: np.ndarray,
+    beta: float,
+    v0: float,
+    d: float,
+    lam: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Closed-form integral of the kernel over the uniform bunch, O(Nt).
+
+    With R^2 - beta^2 d^2 = d^2 / gamma^2 + u^2 (u = z' + v0 * t) the
+    integrands are d / (a^2 + u^2)^(3/2) and u / (a^2 + u^2)^(3/2), whose
+    antiderivatives are d * u / (a^2 * sqrt(a^2 + u^2)) and -1 / sqrt(a^2 + u^2).
+    The differences are rewritten so that distant times (u1 ~ u2, e.g. the
+    +/-1e8 s span) do not cancel catastrophically. Only the end points of
+    ``z_prime`` are used.
+    """
+    pref_const = -lam / (4.0 * math.pi * epsilon_0)
+    geom_factor = (1.0 - beta * beta)
+    a2 = d * d * geom_factor
+    length = z_prime[-1] - z_prime[0]  # u2 - u1, kept exact for large |t|
+    u1 = z_prime[0] + v0 * times
+    u2 = z_prime[-1] + v0 * times
+    s1 = np.sqrt(a2 + u1 * u1)
+    s2 = np.sqrt(a2 + u2 * u2)
+
+    # u2/s2 - u1/s1, rationalised when both ends lie on the same side
+    same_side = u1 * u2 > 0.0
+    direct = u2 / s2 - u1 / s1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rationalised = a2 * length * (u2 + u1) / ((u2 * s1 + u1 * s2) * s1 * s2)
+    x_term = np.where(same_side, rationalised, direct)
+    # 1/s1 - 1/s2 has no cancellation once written over a common denominator
+    z_term = length * (u2 + u1) / ((s1 + s2) * s1 * s2)
+
+    ex = pref_const * geom_factor * d / a2 * x_term
+    ez = pref_const * geom_factor * z_term
+    return ex, ez
+
+
+@result_cache.cached(ignore=("batch_size", "max_memory", "workers"))
+def compute_fields(
+    times: np.ndarray,
+    z_prime: np.ndarray,
+    beta: float,
+    v0: float,
+    d: float,
+    lam: float,
+    batch_size: Optional[int] = None,
+    engine: str = ENGINE_DEFAULT,
+    max_memory: float = MAX_MEMORY_DEFAULT,
+    workers: int = 1,
+) -> Dict[str, np.ndarray]:
+    """
+    Integrate Ex(t), Ez(t), and derive magnetic components.
+
+    engine="trapz" integrates over ``z_prime`` directly in time batches that
+    reuse one preallocated set of work buffers; ``batch_size=None`` sizes the
+    batches so the buffers stay within ``max_memory`` bytes. ``workers`` > 1
+    runs the trapz batches on a thread pool (the budget is split between the
+    threads); the output is bit-identical to the serial run.
+    engine="fft" evaluates the same lambda-star-E cross-correlation with FFTs
+    on uniformly spaced ``times``, with the kernel sampled on the output grid
+    (refined only when dt does not resolve it); it matches the analytic
+    solution to better than 1e-6 of the peak field and, like it, uses only the
+    end points of ``z_prime``.
+    engine="analytic" uses the closed-form rect-profile solution; only the end
+    points of ``z_prime`` matter and any time span costs O(Nt). At Nz=4000 the
+    trapz path agrees with it to ~2e-8 of the peak (its discretisation error).
+    """
+    if engine == "trapz":
+        if batch_size is None:
+            batch_size = auto_batch_size(len(z_prime), max_memory, len(times), workers)
+        ex, ez = _integrate_trapz(times, z_prime, beta, v0, d, lam, batch_size, workers)
+    elif engine == "fft":
+        ex, ez = _integrate_fft(times, z_prime, beta, v0, d, lam)
+    elif engine == "analytic":
+        ex, ez = _integrate_analytic(times, z_prime, beta, v0, d, lam)
+    else:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {FIELD_ENGINES}.")
+
+    return _field_dict(ex, ez, v0)
+
+
+def _field_dict(ex: np.ndarray, ez: np.ndarray, v0: float) -> Dict[str, np.ndarray]:
+    """All E/B components and magnitudes from Ex(t), Ez(t) on the (d, 0, 0) observer."""
+    ey = np.zeros_like(ex)
+    bx = np.zeros_like(ex)
+    bz = np.zeros_like(ex)
+    by = (v0 / (c * c)) * ex  # from (1/c^2) * v x E
+
+    e_mag = np.sqrt(ex**2 + ez**2)
+    b_mag = np.sqrt(bx**2 + by**2 + bz**2)
+    return {
+        "Ex": ex,
+        "Ey": ey,
+        "Ez": ez,
+        "Bx": bx,
+        "By": by,
+        "Bz": bz,
+        "|E|": e_mag,
+        "|B|": b_mag,
+    }
+
+
+# -----------------------------------------------------------------------------
+# Plotting
+# -----------------------------------------------------------------------------
+def plot_em_fields_grid(
+    times_scaled: np.ndarray,
+    time_label: str,
+    fields: Dict[str, np.ndarray],
+    beta: float,
+    gamma: float,
+    save_plots: bool,
+    outfile: str = "micropulse_EM_field.png",
+    show: bool = False,
+) -> None:
+    """Create a 2x2 subplot layout like single_electron.py."""
+    dpi = 600
+    plt = pyplot()
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8), sharex=True)
+    ax_flat = axes.flatten()
+
+    # |E|
+    plot_line(ax_flat[0], times_scaled, fields["|E|"], color="tab:purple", dpi=dpi)
+    ax_flat[0].set_ylabel("电场幅值 (V/m)")
+    ax_flat[0].set_title("电场幅值")
+    ax_flat[0].grid(True, linestyle="--", alpha=0.4)
+    # annotate_peak(ax_flat[0], times_scaled, fields["|E|"], "tab:purple", "|E|")
+
+    # E components
+    plot_line(ax_flat[1], times_scaled, fields["Ex"], label="E_x", color="tab:blue", dpi=dpi)
+    plot_line(ax_flat[1], times_scaled, fields["Ez"], label="E_z", color="tab:orange", dpi=dpi)
+    ax_flat[1].set_ylabel("电场分量 (V/m)")
+    ax_flat[1].set_title("电场分量")
+    ax_flat[1].grid(True, linestyle="--", alpha=0.4)
+    ax_flat[1].legend(loc="upper right")
+
+    # |B|
+    plot_line(ax_flat[2], times_scaled, fields["|B|"], color="tab:orange", dpi=dpi)
+    ax_flat[2].set_ylabel("磁场幅值 (T)")
+    ax_flat[2].set_title("磁场幅值")
+    ax_flat[2].grid(True, linestyle="--", alpha=0.4)
+    # annotate_peak(ax_flat[2], times_scaled, fields["|B|"], "tab:orange", "|B|")
+
+    # B components
+    plot_line(ax_flat[3], times_scaled, fields["By"], label="B_y", color="tab:red", dpi=dpi)
+    ax_flat[3].set_ylabel("磁场分量 (T)")
+    ax_flat[3].set_title(f"磁场分量 (beta={beta:.4f}, gamma={gamma:.3f})")
+    ax_flat[3].set_xlabel(time_label)
+    ax_flat[3].grid(True, linestyle="--", alpha=0.4)
+    ax_flat[3].legend(loc="upper right")
+
+    fig.tight_layout()
+    if save_plots:
+        fig.savefig(outfile, dpi=dpi)
+    if show:
+        plt.show()
+    plt.close(fig)
+
+
+# -----------------------------------------------------------------------------
+# Simulation orchestration
+# -----------------------------------------------------------------------------
+def build_time_grid(
+    tau0: float,
+    Nt: int,
+    args: argparse.Namespace,
+    use_extreme_span_flag: bool,
+) -> Tuple[np.ndarray, float, float, str]:
+    """Determine the time span per prompt requirements."""
+    if args.t_min is not None or args.t_max is not None:
+        default_min = t_min_default if use_extreme_span_flag else -REALISTIC_SPAN_MULTIPLIER * tau0
+        default_max = t_max_default if use_extreme_span_flag else REALISTIC_SPAN_MULTIPLIER * tau0
+        t_min = args.t_min if args.t_min is not None else default_min
+        t_max = args.t_max if args.t_max is not None else default_max
+        span_note = "User-selected custom span"
+    elif args.use_extreme_span or use_extreme_span_flag:
+        t_min, t_max = t_min_default, t_max_default
+        span_note = "Prompt extreme span (+/-1e8 s)"
+    else:
+        t_min = -REALISTIC_SPAN_MULTIPLIER * tau0
+        t_max = REALISTIC_SPAN_MULTIPLIER * tau0
+        span_note = f"Realistic span +/-{REALISTIC_SPAN_MULTIPLIER:.1f} tau0"
+
+    if t_min >= t_max:
+        raise ValueError("t_min must be smaller than t_max.")
+
+    Nt_used = ensure_odd(Nt)  # include t = 0
+    times = np.linspace(t_min, t_max, Nt_used)
+    return times, t_min, t_max, span_note
+
+
+def build_adaptive_time_grid(
+    t_min: float,
+    t_max: float,
+    z_prime: np.ndarray,
+    gamma: float,
+    beta: float,
+    v0: float,
+    d: float,
+    lam: float,
+    engine: str,
+    rtol: float,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Non-uniform grid that resolves the pulse around t = 0 (scale
+    max(tau0, t0/(beta*gamma))) and samples the tails log-spaced; returns the
+    grid and the fields already evaluated on it.
+    """
+    if engine == "fft":
+        raise ValueError("The adaptive time grid is non-uniform; use engine='trapz' or 'analytic'.")
+    tau_half = 0.5 * (z_prime[-1] - z_prime[0]) / v0
+    scale = max(tau_half, d / c / (beta * gamma))
+
+    def evaluate(t: np.ndarray) -> np.ndarray:
+        fields = compute_fields(t, z_prime, beta, v0, d, lam, engine=engine)
+        return np.stack([fields["Ex"], fields["Ez"]])
+
+    with result_cache.bypass():  # refinement passes are not worth caching
+        times, (ex, ez) = time_grid.adaptive_time_grid(evaluate, t_min, t_max, scale, rtol)
+    return times, _field_dict(ex, ez, v0)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.no_cache:
+        result_cache.set_enabled(False)
+
+    Nt = args.Nt or Nt_config
+    Nz = args.Nz or Nz_config
+    max_memory = args.max_memory or max_memory_config
+    workers = args.workers or workers_config
+    engine = args.engine or engine_config
+    save_plots = save_plots_default and not args.no_save_plots
+
+    use_extreme_span_flag = args.use_extreme_span or (not use_realistic_t_span)
+    times, t_min_used, t_max_used, span_note = build_time_grid(
+        tau0, Nt, args, use_extreme_span_flag
+    )
+    if args.converge:
+        from .convergence import converge_micropulse
+
+        result = converge_micropulse(
+            t_min_used, t_max_used, args.converge, d, E_k_eV, N_electrons, tau0, engine,
+            use_cache=not args.no_cache,
+        )
+        print(result.report())
+        Nz = result.grid["Nz"]
+        times = np.linspace(t_min_used, t_max_used, result.grid["Nt"])
+        span_note += ", converged grid"
+    Nt_used = len(times)
+    batch_size = args.batch_size or batch_t_size  # None: compute_fields sizes per worker
+
+    gamma, beta, v0 = compute_gamma_beta_v0(E_k_eV)
+    lam = compute_line_charge_density(N_electrons, v0, tau0)
+    z_prime = np.linspace(-v0 * tau0, v0 * tau0, Nz)
+    fields = None
+    grid_elapsed = 0.0
+    if args.adaptive_time:
+        start = time.perf_counter()
+        times, fields = build_adaptive_time_grid(  # fields come with the grid
+            t_min_used, t_max_used, z_prime, gamma, beta, v0, d, lam, engine, args.time_rtol
+        )
+        grid_elapsed = time.perf_counter() - start
+        Nt_used = len(times)
+        span_note += ", adaptive grid"
+
+    batch_shown = batch_size or auto_batch_size(Nz, max_memory, Nt_used, workers)
+    mem_estimate = estimate_batch_memory(batch_shown * min(workers, -(-Nt_used // batch_shown)), Nz)
+    print("=== Micropulse Simulation Parameters ===")
+    print(f"d (observer offset)   : {d:.2f} m")
+    print(f"E_k                   : {E_k_eV:.2e} eV")
+    print(f"Total electrons       : {N_electrons:.2e}")
+    print(f"tau0                  : {tau0:.2e} s")
+    print(f"Time span             : [{t_min_used:.3e}, {t_max_used:.3e}] s ({span_note})")
+    print(f"Nt (time samples)     : {Nt_used} (batched {batch_shown}, {workers} workers)")
+    print(f"Nz (z' samples)       : {Nz}")
+    print(f"Engine                : {engine}")
+    print(f"Estimated work RAM    : {mem_estimate}")
+    print(f"gamma                 : {gamma:.6f}")
+    print(f"beta                  : {beta:.6f}")
+    print(f"v0                    : {v0:.6e} m/s")
+    print(f"lambda (C/m)          : {lam:.6e}")
+    start = time.perf_counter()
+    if fields is None:
+        print("Computing fields ...")
+        fields = compute_fields(
+            times, z_prime, beta, v0, d, lam, batch_size, engine, max_memory, workers
+        )
+    elapsed = grid_elapsed + time.perf_counter() - start
+
+    if args.output:
+        save_results(
+            args.output,
+            "micropulse",
+            {"times": times, **fields},
+            {
+                "d_m": d,
+                "E_k_eV": E_k_eV,
+                "N_electrons": N_electrons,
+                "tau0_s": tau0,
+                "gamma": gamma,
+                "beta": beta,
+                "engine": engine,
+                "Nz": Nz,
+            },
+        )
+    if not args.no_plot:
+        time_scaled, time_label = choose_time_axis(times)
+        plot_em_fields_grid(time_scaled, time_label, fields, beta, gamma, save_plots, show=args.show)
+
+    e_peak_idx = int(np.argmax(np.abs(fields["|E|"])))
+    b_peak_idx = int(np.argmax(np.abs(fields["|B|"])))
+    e_fwhm, e_half = compute_fwhm(times, fields["|E|"])
+    b_fwhm, b_half = compute_fwhm(times, fields["|B|"])
+    print("=== Diagnostics ===")
+    print(f"Peak |E| : {fields['|E|'][e_peak_idx]:.4e} V/m at t = {times[e_peak_idx]:.4e} s")
+    print(f"Peak |B| : {fields['|B|'][b_peak_idx]:.4e} T at t = {times[b_peak_idx]:.4e} s")
+    print(f"E-field FWHM: {e_fwhm * 1e9:.3f} ns (half max = {e_half:.3e} V/m)")
+    print(f"B-field FWHM: {b_fwhm * 1e9:.3f} ns (half max = {b_half:.3e} T)")
+    print(f"Computation time: {elapsed:.2f} s")
+    if args.output:
+        print(f"Saved results: {args.output}")
+    if args.no_plot:
+        print("Plotting disabled (--no-plot).")
+    elif save_plots:
+        print("Saved plots: micropulse_EM_field.png")
+    else:
+        print("Plot saving disabled (pass --no-save-plots to disable saving).")
+
+
+if __name__ == "__main__":
+    main()
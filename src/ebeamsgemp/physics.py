@@ -0,0 +1,39 @@
+"""
+physics.py
+==========
+
+Shared physical constants (CODATA 2018, SI) and beam kinematics.
+
+Every module takes its constants from here instead of carrying its own
+rounded copies (1.6e-19, 8.85e-12, 3e8, ...). The values are literals so that
+importing this module costs nothing beyond NumPy.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+E_CHARGE = 1.602176634e-19         # elementary charge (C)
+EPSILON_0 = 8.8541878128e-12       # vacuum permittivity (F/m)
+C_LIGHT = 299792458.0              # speed of light (m/s)
+M_E = 9.1093837015e-31             # electron mass (kg)
+ELECTRON_REST_ENERGY_MEV = M_E * C_LIGHT**2 / E_CHARGE * 1e-6  # 0.51099895 MeV
+
+
+def lorentz_factors(Ek_MeV: float) -> Tuple[float, float, float]:
+    """gamma, beta and velocity (m/s) of an electron with kinetic energy Ek (MeV)."""
+    gamma = 1.0 + Ek_MeV / ELECTRON_REST_ENERGY_MEV
+    beta = float(np.sqrt(max(0.0, 1.0 - 1.0 / gamma**2)))
+    return gamma, beta, beta * C_LIGHT
+
+
+def transit_time(distance: float) -> float:
+    """t_0 = d / c, the light travel time to the probe (s)."""
+    return distance / C_LIGHT
+
+
+def coulomb_factor(charge: float) -> float:
+    """q / (4 pi epsilon_0)."""
+    return charge / (4.0 * np.pi * EPSILON_0)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+probes.py
+=========
+
+Fields of one bunch at many observers (D-dot / B-dot probe arrays).
+
+The single-observer engines place the probe at (d, 0, 0). The beam runs along
+z through x = y = 0, so the field at any observer (x, y, z) follows from theirs
+by symmetry: with rho = sqrt(x^2 + y^2) and phi = atan2(y, x),
+
+    E_rho(t), E_z(t) = single-observer fields at d = rho, evaluated at t - z/v
+    E_x = E_rho cos(phi),   E_y = E_rho sin(phi)
+    B = (1/c^2) v x E  ->   B_x = -(v/c^2) E_y,   B_y = (v/c^2) E_x,   B_z = 0
+
+(the bunch centre passes z = 0 at t = 0 and reaches the probe plane at z/v).
+Off-plane probes (y != 0) therefore see nonzero E_y and B_x.
+
+Evaluation per engine:
+    single electron        single_electron.calculate_EM_fields, broadcast over
+                           (probe, time) in row chunks within ``max_memory``
+                           and rescaled from its charge Q_E to N electrons
+    uniform bunch          micropulse.compute_fields; engine="analytic" is
+                           broadcast over all probes in row chunks, the
+                           quadrature engines run once per distinct radius
+    gaussian bunch         gaussian_micro.compute_fields once per distinct
+                           radius, or with ``universal=True`` all probes in
+                           one waveform_store.fields_batch call
+
+``t`` is either one time axis shared by all probes (Nt,) or one row per probe
+(n, Nt). Every function returns the micropulse.compute_fields dict ("Ex",
+"Ey", "Ez", "Bx", "By", "Bz", "|E|", "|B|") with (n, Nt) arrays.
+
+Running ``python -m ebeamsgemp.probes --probe 1 0 0 --probe 0 0.5 2`` prints
+the peak fields per probe, each on a window centred on its arrival time;
+``--positions FILE`` reads x y z rows (m) and ``--output`` stores the fields
+as ``.npz``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import replace
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import gaussian_micro, micropulse, physics, result_cache, single_electron, waveform_store
+
+PROFILES = ("gaussian", "uniform", "single")
+MAX_MEMORY_DEFAULT = 256 * 1024**2  # bytes of (probe, time) work arrays per chunk
+WORK_ARRAYS = 16                    # temporaries per (probe, time) element of the closed forms
+SPAN_DEFAULT = 10.0                 # CLI half window in units of max(tau0, rho/(c beta gamma))
+
+Fields = Dict[str, np.ndarray]
+RadialEvaluator = Callable[[np.ndarray, float], Tuple[np.ndarray, np.ndarray]]
+
+
+# -----------------------------------------------------------------------------
+# Geometry
+# -----------------------------------------------------------------------------
+def probe_geometry(positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """rho, cos(phi), sin(phi) and z of observers given as (n, 3) x, y, z rows (m)."""
+    positions = np.atleast_2d(np.asarray(positions, dtype=float))
+    if positions.ndim != 2 or positions.shape[1] != 3:
+        raise ValueError(f"positions must have shape (n, 3), got {positions.shape}.")
+    x, y, z = positions.T
+    rho = np.hypot(x, y)
+    if np.any(rho <= 0.0):
+        raise ValueError("Probes on the beam axis (x = y = 0) are not supported.")
+    return rho, x / rho, y / rho, z
+
+
+def probe_times(t: np.ndarray, n_probes: int) -> np.ndarray:
+    """Time rows (n, Nt) from a shared axis (Nt,) or per-probe rows (n, Nt)."""
+    t = np.asarray(t, dtype=float)
+    if t.ndim == 2 and t.shape[0] != n_probes:
+        raise ValueError(f"t has {t.shape[0]} rows for {n_probes} probes.")
+    return np.broadcast_to(t, (n_probes, t.shape[-1]))
+
+
+def field_components(
+    E_rho: np.ndarray, E_z: np.ndarray, v: float, cos_phi: np.ndarray, sin_phi: np.ndarray
+) -> Fields:
+    """Cartesian E and B of the radial / axial fields (rows = probes)."""
+    E_x = E_rho * cos_phi[:, None]
+    E_y = E_rho * sin_phi[:, None]
+    B_phi = (v / physics.C_LIGHT**2) * E_rho
+    return {
+        "Ex": E_x,
+        "Ey": E_y,
+        "Ez": E_z,
+        "Bx": -B_phi * sin_phi[:, None],
+        "By": B_phi * cos_phi[:, None],
+        "Bz": np.zeros_like(E_rho),
+        "|E|": np.sqrt(E_rho**2 + E_z**2),
+        "|B|": np.abs(B_phi),
+    }
+
+
+def _row_chunks(n_rows: int, n_cols: int, max_memory: float) -> Iterator[slice]:
+    rows = max(1, int(max_memory // (WORK_ARRAYS * 8 * max(n_cols, 1))))
+    for start in range(0, n_rows, rows):
+        yield slice(start, start + rows)
+
+
+def _per_radius(
+    rows: np.ndarray, rho: np.ndarray, evaluate: RadialEvaluator, split_rows: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    E_rho, E_z with one ``evaluate(times, radius)`` call per distinct radius on
+    the concatenated rows of its probes (per probe with ``split_rows``, for
+    engines that need a uniform or compact time axis).
+    """
+    E_rho = np.empty(rows.shape)
+    E_z = np.empty(rows.shape)
+    radii, inverse = np.unique(rho, return_inverse=True)
+    for k, radius in enumerate(radii):
+        members = np.flatnonzero(inverse == k)
+        for group in np.split(members, members.size) if split_rows else (members,):
+            e_rho, e_z = evaluate(rows[group].ravel(), float(radius))
+            E_rho[group] = np.reshape(e_rho, (group.size, -1))
+            E_z[group] = np.reshape(e_z, (group.size, -1))
+    return E_rho, E_z
+
+
+# -----------------------------------------------------------------------------
+# Engines
+# -----------------------------------------------------------------------------
+def single_electron_fields(
+    t: np.ndarray,
+    positions: np.ndarray,
+    Ek: float = 10.0,
+    N: float = single_electron.Q_E / physics.E_CHARGE,
+    t_0: float = 0.0,
+    z_0: float = 0.0,
+    max_memory: float = MAX_MEMORY_DEFAULT,
+) -> Fields:
+    """Fields of single_electron.calculate_EM_fields, scaled to N point electrons, at every probe."""
+    rho, cos_phi, sin_phi, z = probe_geometry(positions)
+    rows = probe_times(t, rho.size)
+    gamma, beta, v = single_electron.calculate_relativistic_parameters(Ek)
+    scale = N * physics.E_CHARGE / single_electron.Q_E  # the fields are linear in the charge
+    E_rho = np.empty(rows.shape)
+    E_z = np.empty(rows.shape)
+    for chunk in _row_chunks(*rows.shape, max_memory):
+        # d and z_0 broadcast as columns; the probe plane z adds to the reference position
+        fields = single_electron.calculate_EM_fields(
+            rows[chunk], gamma, beta, v, rho[chunk, None], t_0, z_0 + z[chunk, None]
+        )
+        E_rho[chunk], E_z[chunk] = scale * fields[0], scale * fields[2]
+    return field_components(E_rho, E_z, v, cos_phi, sin_phi)
+
+
+def micropulse_fields(
+    t: np.ndarray,
+    positions: np.ndarray,
+    Ek_MeV: float = micropulse.E_K_EV_DEFAULT * 1e-6,
+    N: float = micropulse.N_ELECTRONS_DEFAULT,
+    tau0: float = micropulse.TAU0_DEFAULT,
+    engine: str = "analytic",
+    Nz: int = micropulse.NZ_DEFAULT,
+    max_memory: float = MAX_MEMORY_DEFAULT,
+) -> Fields:
+    """Fields of the uniform bunch (micropulse.compute_fields) at every probe."""
+    rho, cos_phi, sin_phi, z = probe_geometry(positions)
+    _, beta, v0 = micropulse.compute_gamma_beta_v0(Ek_MeV * 1e6)
+    rows = probe_times(t, rho.size) - z[:, None] / v0
+    lam = micropulse.compute_line_charge_density(N, v0, tau0)
+    z_prime = np.linspace(-v0 * tau0, v0 * tau0, Nz)
+
+    if engine == "analytic":
+        E_rho = np.empty(rows.shape)
+        E_z = np.empty(rows.shape)
+        with result_cache.bypass():
+            for chunk in _row_chunks(*rows.shape, max_memory):
+                # the closed form broadcasts over a column of distances
+                fields = micropulse.compute_fields(
+                    rows[chunk], z_prime, beta, v0, rho[chunk, None], lam, engine="analytic"
+                )
+                E_rho[chunk], E_z[chunk] = fields["Ex"], fields["Ez"]
+    else:
+        def evaluate(times: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+            fields = micropulse.compute_fields(
+                times, z_prime, beta, v0, radius, lam, engine=engine, max_memory=max_memory
+            )
+            return fields["Ex"], fields["Ez"]
+
+        E_rho, E_z = _per_radius(rows, rho, evaluate, split_rows=engine == "fft")
+    return field_components(E_rho, E_z, v0, cos_phi, sin_phi)
+
+
+def gaussian_fields(
+    t: np.ndarray,
+    positions: np.ndarray,
+    params: gaussian_micro.SimulationParams,
+    universal: bool = False,
+    max_memory: float = MAX_MEMORY_DEFAULT,
+) -> Fields:
+    """
+    Fields of the Gaussian bunch (gaussian_micro.compute_fields) at every probe;
+    ``params.distance`` is replaced by each probe's radius.
+    """
+    rho, cos_phi, sin_phi, z = probe_geometry(positions)
+    v = params.beta * physics.C_LIGHT
+    rows = probe_times(t, rho.size) - z[:, None] / v
+
+    if universal:
+        store = waveform_store.waveform_store()
+        E_rho = np.empty(rows.shape)
+        E_z = np.empty(rows.shape)
+        for chunk in _row_chunks(*rows.shape, max_memory):
+            E_rho[chunk], E_z[chunk], _ = store.fields_batch(
+                rows[chunk], params.Ek_MeV, rho[chunk], params.N, params.tau_0
+            )
+    else:
+        def evaluate(times: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+            E_x, E_z, _ = gaussian_micro.compute_fields(times, replace(params, distance=radius))
+            return E_x, E_z
+
+        E_rho, E_z = _per_radius(rows, rho, evaluate, split_rows=params.quadrature == "spectral")
+    return field_components(E_rho, E_z, v, cos_phi, sin_phi)
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def arrival_windows(
+    positions: np.ndarray, Ek_MeV: float, tau0: float, Nt: int, span: float = SPAN_DEFAULT
+) -> np.ndarray:
+    """Per-probe time rows centred on the arrival z/v, +/- span * max(tau0, rho/(c beta gamma))."""
+    rho, _, _, z = probe_geometry(positions)
+    gamma, beta, v = physics.lorentz_factors(Ek_MeV)
+    half_window = span * np.maximum(tau0, physics.transit_time(rho) / (beta * gamma))
+    return z[:, None] / v + half_window[:, None] * np.linspace(-1.0, 1.0, Nt)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fields of one micropulse at an array of probes.")
+    parser.add_argument(
+        "--probe", type=float, nargs=3, action="append", default=None, metavar=("X", "Y", "Z"),
+        help="probe position (m), repeatable",
+    )
+    parser.add_argument("--positions", type=str, default=None, help="text/CSV file of x y z rows (m)")
+    parser.add_argument("--profile", choices=PROFILES, default="gaussian", help="bunch shape")
+    parser.add_argument("--Ek", type=float, default=10.0, help="kinetic energy (MeV)")
+    parser.add_argument("--N", type=float, default=1e10, help="electrons per micropulse")
+    parser.add_argument("--tau0", type=float, default=100e-12, help="bunch half width (s)")
+    parser.add_argument("--Nt", type=int, default=2001, help="time samples per probe")
+    parser.add_argument("--span", type=float, default=SPAN_DEFAULT, help="half window per probe")
+    parser.add_argument("--universal", action="store_true", help="gaussian: interpolate stored waveforms")
+    parser.add_argument("--output", type=str, default=None, help="write t and the fields to .npz")
+    args = parser.parse_args(argv)
+    if args.probe is None and args.positions is None:
+        parser.error("give --probe X Y Z and/or --positions FILE")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    rows = list(args.probe or [])
+    if args.positions:
+        delimiter = "," if args.positions.endswith(".csv") else None
+        rows.extend(np.loadtxt(args.positions, delimiter=delimiter, ndmin=2).tolist())
+    positions = np.asarray(rows, dtype=float)
+
+    tau0 = 0.0 if args.profile == "single" else args.tau0
+    t = arrival_windows(positions, args.Ek, tau0, args.Nt, args.span)
+    start = time.perf_counter()
+    if args.profile == "gaussian":
+        params = gaussian_micro.SimulationParams(
+            N=args.N, Ek_MeV=args.Ek, tau_0=args.tau0, Nt=args.Nt, quadrature="gauss-hermite"
+        )
+        fields = gaussian_fields(t, positions, params, universal=args.universal)
+    elif args.profile == "uniform":
+        fields = micropulse_fields(t, positions, args.Ek, args.N, args.tau0)
+    else:
+        fields = single_electron_fields(t, positions, args.Ek, args.N)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'x (m)':>8s} {'y (m)':>8s} {'z (m)':>8s} {'|E| peak (V/m)':>15s} {'|B| peak (T)':>13s} {'t_peak (s)':>11s}")
+    for i, (x, y, z) in enumerate(positions):
+        peak = int(np.argmax(fields["|E|"][i]))
+        print(
+            f"{x:8.3f} {y:8.3f} {z:8.3f} {fields['|E|'][i, peak]:15.4e} "
+            f"{np.max(fields['|B|'][i]):13.4e} {t[i, peak]:11.4e}"
+        )
+    print(f"Elapsed   : {elapsed:.3f} s for {len(positions)} probes")
+    if args.output:
+        np.savez_compressed(args.output, t=t, positions=positions, **fields)
+        print(f"Saved     : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
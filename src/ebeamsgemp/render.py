@@ -0,0 +1,128 @@
+"""
+render.py
+=========
+
+Draw the figures of a run from its result file, so that batch jobs can run
+with ``--no-plot --output results.npz`` (no matplotlib, no ``plt.show()``)
+and plots are made afterwards, e.g. on a workstation:
+
+    python -m ebeamsgemp.gaussian_micro --no-plot --output run.npz
+    python -m ebeamsgemp.render run.npz                # -> run.png, run_freq.png
+    python -m ebeamsgemp.render run.h5 --outfile fig.png --show
+
+The result ``kind`` selects the ``plot_*`` function of the entry point that
+wrote the file, so the figures are identical to those of a plotting run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import importlib
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .results import load_results
+
+Arrays = Dict[str, np.ndarray]
+Metadata = Dict[str, Any]
+
+
+def _with_suffix(outfile: str, suffix: str) -> str:
+    stem, ext = os.path.splitext(outfile)
+    return f"{stem}{suffix}{ext}"
+
+
+def _render_single_electron(arrays: Arrays, metadata: Metadata, outfile: str, show: bool) -> List[str]:
+    from . import single_electron
+
+    single_electron.plot_em_fields(
+        arrays["t"], arrays["E_x"], arrays["E_z"], arrays["B_y"], arrays["E_mag"], arrays["B_mag"],
+        outfile=outfile,
+        show=show,
+    )
+    return [outfile]
+
+
+def _render_micropulse(arrays: Arrays, metadata: Metadata, outfile: str, show: bool) -> List[str]:
+    from . import micropulse
+
+    times = arrays.pop("times")
+    time_scaled, time_label = micropulse.choose_time_axis(times)
+    micropulse.plot_em_fields_grid(
+        time_scaled, time_label, arrays, metadata["beta"], metadata["gamma"], True, outfile=outfile, show=show
+    )
+    return [outfile]
+
+
+def _render_gaussian_micro(arrays: Arrays, metadata: Metadata, outfile: str, show: bool) -> List[str]:
+    from . import gaussian_micro
+
+    names = {field.name for field in dataclasses.fields(gaussian_micro.SimulationParams)}
+    params = gaussian_micro.SimulationParams(**{k: v for k, v in metadata.items() if k in names})
+    outfreq = _with_suffix(outfile, "_freq")
+    gaussian_micro.plot_fields(
+        arrays["t"], arrays["E_x"], arrays["E_z"], arrays["B_y"], params, outfile=outfile, show=show
+    )
+    gaussian_micro.plot_frequency_spectrum(arrays["freq"], arrays["spectrum"], outfile=outfreq, show=show)
+    return [outfile, outfreq]
+
+
+def _spectra_renderer(module_name: str) -> Callable[[Arrays, Metadata, str, bool], List[str]]:
+    def render(arrays: Arrays, metadata: Metadata, outfile: str, show: bool) -> List[str]:
+        module = importlib.import_module(f"{__package__}.{module_name}")
+        module.plot_spectra(arrays["f"], arrays["E_micro"], arrays["E_macro"], outfile, show=show)
+        return [outfile]
+
+    return render
+
+
+RENDERERS: Dict[str, Callable[[Arrays, Metadata, str, bool], List[str]]] = {
+    "single_electron": _render_single_electron,
+    "micropulse": _render_micropulse,
+    "gaussian_micro": _render_gaussian_micro,
+    "gaussian_macro": _spectra_renderer("gaussian_macro"),
+    "gaussian_modulate_macro": _spectra_renderer("gaussian_modulate_macro"),
+}
+
+
+def render(path: str, outfile: Optional[str] = None, show: bool = False) -> List[str]:
+    """Render the figures of a result file; returns the image paths written."""
+    kind, arrays, metadata = load_results(path)
+    if kind not in RENDERERS:
+        raise ValueError(f"Unknown result kind '{kind}' in {path}; expected one of {sorted(RENDERERS)}.")
+    if outfile is None:
+        outfile = os.path.splitext(path)[0] + ".png"
+    return RENDERERS[kind](arrays, metadata, outfile, show)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Render figures from .npz/.h5 result files written with --output.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("results", nargs="+", help="result files (.npz / .h5 / .hdf5)")
+    parser.add_argument(
+        "--outfile",
+        type=str,
+        default=None,
+        help="image file name (default: result file name with .png); only with a single result file",
+    )
+    parser.add_argument("--show", action="store_true", help="also open the figures interactively")
+    args = parser.parse_args(argv)
+    if args.outfile is not None and len(args.results) > 1:
+        parser.error("--outfile needs exactly one result file")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    for path in args.results:
+        for image in render(path, args.outfile, args.show):
+            print(f"{path} -> {image}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+result_cache.py
+===============
+
+Content-addressed on-disk cache for field and spectrum computations.
+
+``@cached()`` wraps a compute function so that its return value (an array, a
+tuple of arrays or a dict of arrays) is stored under a key derived from
+
+    * the function's module and qualified name,
+    * a hash of every source file of the package (engine_digest) and
+      CACHE_FORMAT, so editing a helper module (the x*K1 table, the Dirichlet
+      kernel, ...) invalidates results of the functions built on it,
+    * every bound argument: arrays by dtype/shape/bytes, dataclasses by their
+      fields, dicts/sequences/scalars by value.
+
+Entries live as ``.npz`` files in the cache directory. Hits refresh the file
+mtime, and once the directory grows beyond ``max_bytes`` the least recently
+used entries are evicted down to LOW_WATER * max_bytes, so a full cache is
+rescanned once per batch of evictions rather than on every store.
+
+Configuration:
+    EBEAMSGEMP_CACHE=0            disable the cache for the process (set_enabled
+                                  exports it, so worker processes follow)
+    EBEAMSGEMP_CACHE_DIR=path     cache directory (default ~/.cache/ebeamsgemp)
+    EBEAMSGEMP_CACHE_MAX_BYTES=n  LRU size cap (default 1 GiB)
+    set_enabled(False) / with bypass(): ...   programmatic bypass
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+
+CACHE_FORMAT = 1  # bump to invalidate every existing entry
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ebeamsgemp")
+DEFAULT_MAX_BYTES = 1 << 30
+LOW_WATER = 0.8  # eviction trims the cache to this fraction of max_bytes
+
+
+class ResultCache:
+    """A directory of ``<key>.npz`` entries with an LRU size cap."""
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+        self._size: Optional[int] = None  # running estimate, scanned lazily
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".npz")
+
+    def _entries(self) -> Iterator[os.DirEntry]:
+        if not os.path.isdir(self.directory):
+            return
+        for sub in os.scandir(self.directory):
+            if sub.is_dir():
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith(".npz"):
+                        yield entry
+
+    def size(self) -> int:
+        """Total bytes currently stored (rescans the directory)."""
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+        return self._size
+
+    def load(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                value = _unpack(data)
+        except (OSError, ValueError, KeyError):
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)  # mark as recently used
+        return value
+
+    def store(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced = os.path.getsize(path)  # an existing entry is overwritten, not added
+        except OSError:
+            replaced = 0
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, **_pack(value))
+            os.replace(tmp, path)  # atomic, safe with concurrent writers
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+        if self._size is None:
+            self.size()
+        else:
+            self._size += os.path.getsize(path) - replaced
+        if self._size > self.max_bytes:
+            self.evict(int(LOW_WATER * self.max_bytes))
+
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """Delete least recently used entries until at most target_bytes remain; returns bytes freed."""
+        target = self.max_bytes if target_bytes is None else target_bytes
+        entries = []  # (mtime, size, path), one stat per entry
+        for entry in self._entries():
+            with contextlib.suppress(OSError):
+                info = entry.stat()
+                entries.append((info.st_mtime, info.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total - freed <= target:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+                freed += size
+        self._size = total - freed
+        return freed
+
+    def clear(self) -> None:
+        self.evict(target_bytes=0)
+
+
+_cache = ResultCache(
+    os.environ.get("EBEAMSGEMP_CACHE_DIR", DEFAULT_CACHE_DIR),
+    int(float(os.environ.get("EBEAMSGEMP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))),
+    enabled=os.environ.get("EBEAMSGEMP_CACHE", "1") not in ("0", "false", "no", "off"),
+)
+
+
+def get_cache() -> ResultCache:
+    return _cache
+
+
+def configure(
+    directory: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    enabled: Optional[bool] = None,
+) -> ResultCache:
+    """Change the process-wide cache settings."""
+    if directory is not None:
+        _cache.directory = directory
+        _cache._size = None
+    if max_bytes is not None:
+        _cache.max_bytes = int(max_bytes)
+    if enabled is not None:
+        _cache.enabled = enabled
+    return _cache
+
+
+def set_enabled(enabled: bool) -> None:
+    """Switch the cache on or off for this process and the worker processes it starts."""
+    _cache.enabled = enabled
+    os.environ["EBEAMSGEMP_CACHE"] = "1" if enabled else "0"  # inherited by spawned workers
+
+
+@contextlib.contextmanager
+def bypass() -> Iterator[None]:
+    """Temporarily compute everything from scratch without reading or writing entries."""
+    previous = _cache.enabled
+    _cache.enabled = False
+    try:
+        yield
+    finally:
+        _cache.enabled = previous
+
+
+# -----------------------------------------------------------------------------
+# Keys and (de)serialisation
+# -----------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def engine_digest() -> str:
+    """SHA-256 over the names and sources of every module in the package."""
+    h = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith(".py"):
+            h.update(f"{name}:".encode())
+            with open(os.path.join(package_dir, name), "rb") as handle:
+                h.update(handle.read())
+    return h.hexdigest()
+
+
+def _feed(h: "hashlib._Hash", obj: Any) -> None:
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        h.update(f"nd:{arr.dtype.str}:{arr.shape}:".encode())
+        h.update(arr.tobytes())
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        h.update(f"dc:{type(obj).__qualname__}:".encode())
+        _feed(h, {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)})
+    elif isinstance(obj, dict):
+        h.update(b"dict:")
+        for name in sorted(obj):
+            h.update(f"{name}=".encode())
+            _feed(h, obj[name])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"seq:{len(obj)}:".encode())
+        for item in obj:
+            _feed(h, item)
+    elif obj is None or isinstance(obj, (bool, int, float, complex, str, np.generic)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    else:
+        raise TypeError(f"cannot hash argument of type {type(obj).__name__}")
+
+
+def make_key(func: Callable, arguments: Dict[str, Any]) -> str:
+    h = hashlib.sha256()
+    h.update(f"{CACHE_FORMAT}:{func.__module__}.{func.__qualname__}:".encode())
+    h.update(engine_digest().encode())
+    _feed(h, arguments)
+    return h.hexdigest()
+
+
+def _pack(value: Any) -> Dict[str, np.ndarray]:
+    if isinstance(value, np.ndarray):
+        return {"__kind__": np.array("array"), "value": value}
+    if isinstance(value, tuple):
+        packed = {f"item{i}": np.asarray(v) for i, v in enumerate(value)}
+        packed["__kind__"] = np.array("tuple")
+        return packed
+    if isinstance(value, dict):
+        packed = {f"key:{k}": np.asarray(v) for k, v in value.items()}
+        packed["__kind__"] = np.array("dict")
+        return packed
+    raise TypeError(f"cannot cache return value of type {type(value).__name__}")
+
+
+def _unpack(data: Any) -> Any:
+    kind = str(data["__kind__"])
+    if kind == "array":
+        return data["value"]
+    if kind == "tuple":
+        count = len(data.files) - 1
+        return tuple(data[f"item{i}"] for i in range(count))
+    return {name[4:]: data[name] for name in data.files if name.startswith("key:")}
+
+
+def cached(ignore: Sequence[str] = ()) -> Callable[[Callable], Callable]:
+    """
+    Decorator: serve repeated calls from the on-disk cache.
+
+    ``ignore`` names arguments that do not change the result (batch sizes,
+    worker counts, memory budgets) and are left out of the key. Arguments that
+    cannot be hashed make the call bypass the cache.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _cache.enabled:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k not in ignore}
+            try:
+                key = make_key(func, arguments)
+            except TypeError:
+                return func(*args, **kwargs)
+            value = _cache.load(key)
+            if value is None:
+                value = func(*args, **kwargs)
+                with contextlib.suppress(OSError):  # a read-only cache never breaks a run
+                    _cache.store(key, value)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorate
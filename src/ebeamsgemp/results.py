@@ -0,0 +1,93 @@
+"""
+results.py
+==========
+
+Binary result files for headless (``--no-plot``) runs.
+
+A result file holds the arrays of one run (time axes, field components,
+spectra) plus a ``kind`` naming the entry point that produced it and a flat
+metadata dict (scalar parameters, units, version), so that ``render.py`` can
+redraw the figures later without recomputing anything.
+
+Formats, chosen by file suffix:
+    .npz          NumPy archive; metadata stored as a JSON string
+    .h5 / .hdf5   HDF5 via h5py (optional dependency: pip install h5py);
+                  arrays as datasets, kind and metadata as file attributes
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+RESULT_FORMAT = 1
+NPZ_SUFFIXES = (".npz",)
+HDF5_SUFFIXES = (".h5", ".hdf5")
+
+
+def _suffix(path: str) -> str:
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in NPZ_SUFFIXES + HDF5_SUFFIXES:
+        raise ValueError(f"Unsupported result file '{path}', expected .npz, .h5 or .hdf5.")
+    return suffix
+
+
+def _h5py() -> Any:
+    try:
+        import h5py
+    except ImportError as exc:  # optional dependency
+        raise ImportError("Writing/reading .h5 result files requires h5py (pip install h5py).") from exc
+    return h5py
+
+
+def _plain(value: Any) -> Any:
+    """Convert NumPy scalars so that metadata is JSON serialisable."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def save_results(
+    path: str,
+    kind: str,
+    arrays: Mapping[str, np.ndarray],
+    metadata: Optional[Mapping[str, Any]] = None,
+) -> None:
+    """Write ``arrays`` and ``metadata`` of a ``kind`` run to ``path`` (.npz / .h5)."""
+    suffix = _suffix(path)
+    meta = {key: _plain(value) for key, value in (metadata or {}).items()}
+    meta["result_format"] = RESULT_FORMAT
+    if suffix in NPZ_SUFFIXES:
+        np.savez_compressed(
+            path,
+            __kind__=np.array(kind),
+            __metadata__=np.array(json.dumps(meta)),
+            **{name: np.asarray(value) for name, value in arrays.items()},
+        )
+        return
+    h5py = _h5py()
+    with h5py.File(path, "w") as handle:
+        handle.attrs["kind"] = kind
+        handle.attrs["metadata"] = json.dumps(meta)
+        for name, value in arrays.items():
+            handle.create_dataset(name, data=np.asarray(value), compression="gzip")
+
+
+def load_results(path: str) -> Tuple[str, Dict[str, np.ndarray], Dict[str, Any]]:
+    """Return (kind, arrays, metadata) of a result file."""
+    suffix = _suffix(path)
+    if suffix in NPZ_SUFFIXES:
+        with np.load(path, allow_pickle=False) as data:
+            kind = str(data["__kind__"])
+            metadata = json.loads(str(data["__metadata__"]))
+            arrays = {name: data[name] for name in data.files if not name.startswith("__")}
+        return kind, arrays, metadata
+    h5py = _h5py()
+    with h5py.File(path, "r") as handle:
+        kind = str(handle.attrs["kind"])
+        metadata = json.loads(str(handle.attrs["metadata"]))
+        arrays = {name: handle[name][()] for name in handle}
+    return kind, arrays, metadata
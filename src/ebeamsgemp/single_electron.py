@@ -22,21 +22,18 @@ Where:
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
-import matplotlib
-# 设置中文字体和负号显示（如有需要）
-matplotlib.rcParams['font.sans-serif'] = ['Heiti TC', 'STHeiti', 'SimHei', 'Arial Unicode MS']
-matplotlib.rcParams['axes.unicode_minus'] = False  # Use ASCII minus
+from . import physics
+from .plotting import plot_line, pyplot
 
 # =============================================================================
 # CONSTANTS
 # =============================================================================
-Q_E = 1e10 * 1.6e-19           # Elementary charge (Coulombs)
-EPSILON_0 = 8.854e-12   # Permittivity of free space (F/m)
-PI = 3.141592653589793  # Pi
-M_E = 9.109e-31         # Electron mass (kg)
-C = 3e8                 # Speed of light (m/s)
+Q_E = 1e10 * physics.E_CHARGE  # Charge of 1e10 electrons (Coulombs)
+EPSILON_0 = physics.EPSILON_0  # Permittivity of free space (F/m)
+PI = np.pi                     # Pi
+M_E = physics.M_E              # Electron mass (kg)
+C = physics.C_LIGHT            # Speed of light (m/s)
 
 # =============================================================================
 # SIMULATION PARAMETERS
@@ -59,10 +56,7 @@ def calculate_relativistic_parameters(Ek_MeV):
         beta: Dimensionless velocity (v/c)
         v: Velocity in m/s
     """
-    gamma = Ek_MeV / 0.511 + 1  # Convert MeV to γ
-    beta = np.sqrt(1 - 1 / (gamma**2))
-    v = beta * C
-    return gamma, beta, v
+    return physics.lorentz_factors(Ek_MeV)
 
 
 def calculate_EM_fields(t, gamma, beta, v, d, t_0, z_0):
@@ -153,29 +147,31 @@ def compute_em_fields(
     return t, E_x, E_y, E_z, B_x, B_y, B_z, E_mag, B_mag
 
 
-def plot_em_fields(t, E_x, E_z , B_y, E_mag, B_mag):
+def plot_em_fields(t, E_x, E_z , B_y, E_mag, B_mag, outfile="single_electron_em_fields.png", show=False):
     """Visualize EM fields using four stacked subplots as requested."""
+    dpi = 600
+    plt = pyplot()
     fig, axes = plt.subplots(2,2, figsize=(12, 8), sharex=True)
     ax_flat = axes.flatten()
 
-    ax_flat[0].plot(t, E_mag, color="tab:purple")
+    plot_line(ax_flat[0], t, E_mag, color="tab:purple", dpi=dpi)
     ax_flat[0].set_ylabel("电场幅值 (V/m)")
     ax_flat[0].set_title("电场脉冲", fontsize=11)
     ax_flat[0].grid(True, linestyle="--", alpha=0.4)
 
-    ax_flat[1].plot(t, E_x, label="E_x", color="tab:blue")
-    ax_flat[1].plot(t, E_z, label="E_z", color="tab:orange")
+    plot_line(ax_flat[1], t, E_x, label="E_x", color="tab:blue", dpi=dpi)
+    plot_line(ax_flat[1], t, E_z, label="E_z", color="tab:orange", dpi=dpi)
     ax_flat[1].set_ylabel("电场分量 (V/m)")
     ax_flat[1].set_title("电场分量", fontsize=11)
     ax_flat[1].grid(True, linestyle="--", alpha=0.4)
     ax_flat[1].legend(loc="upper right")
 
-    ax_flat[2].plot(t, B_mag, color="tab:green")
+    plot_line(ax_flat[2], t, B_mag, color="tab:green", dpi=dpi)
     ax_flat[2].set_ylabel("磁场幅值 (T)")
     ax_flat[2].set_title("磁场幅值", fontsize=11)
     ax_flat[2].grid(True, linestyle="--", alpha=0.4)
 
-    ax_flat[3].plot(t, B_y, color="tab:red")
+    plot_line(ax_flat[3], t, B_y, color="tab:red", dpi=dpi)
     ax_flat[3].set_ylabel("磁场分量 (T)")
     ax_flat[3].set_title("磁场分量", fontsize=11)
     ax_flat[3].set_xlabel("时间 (s)")
@@ -183,10 +179,14 @@ def plot_em_fields(t, E_x, E_z , B_y, E_mag, B_mag):
 
     fig.suptitle("忽略空间分布的电子产生的电磁脉冲", fontsize=14)
     fig.tight_layout(rect=[0, 0, 1, 0.97])
-    # plt.show()
-    plt.savefig("single_electron_em_fields.png", dpi=600)
+    plt.savefig(outfile, dpi=dpi)
+    if show:
+        plt.show()
+    plt.close(fig)
 
-    # Compute FWHM pulse widths
+
+def report_fwhm(t, E_mag, B_mag):
+    """Print the FWHM pulse widths of |E| and |B|."""
     dt = np.abs(t[1] - t[0]) if len(t) > 1 else 0.0
 
     e_half_max = 0.5 * np.max(E_mag)
@@ -198,18 +198,46 @@ def plot_em_fields(t, E_x, E_z , B_y, E_mag, B_mag):
     print(f"B-field FWHM: {b_duration * 1e9:.3f} ns (half max = {b_half_max:.3e} T)")
 
 
-def main():
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="单电子电磁脉冲计算与绘图",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--outfile", type=str, default="single_electron_em_fields.png", help="输出图片文件名")
+    parser.add_argument("--no-plot", action="store_true", help="不绘图 (不导入 matplotlib), 适用于批处理")
+    parser.add_argument("--show", action="store_true", help="保存后再打开交互窗口")
+    parser.add_argument("--output", type=str, default=None, help="结果文件 (.npz / .h5), 可用 ebeamsgemp.render 重新绘图")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Example usage: compute and plot fields for a default scenario."""
+    from .results import save_results
+
+    args = parse_args(argv)
+    Ek, d = 10.0, 1.0
     t, E_x, _, E_z, _, B_y, _, E_mag, B_mag = compute_em_fields(
         t_start=-1e-9,
         t_end=1e-9,
         num_points=2000,
-        Ek=10.0,
-        d=1.0,
+        Ek=Ek,
+        d=d,
         t_0=0.0,
         z_0=0.0,
     )
-    plot_em_fields(t, E_x, E_z, B_y, E_mag, B_mag)
+    report_fwhm(t, E_mag, B_mag)
+    if args.output:
+        save_results(
+            args.output,
+            "single_electron",
+            {"t": t, "E_x": E_x, "E_z": E_z, "B_y": B_y, "E_mag": E_mag, "B_mag": B_mag},
+            {"Ek_MeV": Ek, "d_m": d, "charge_C": Q_E},
+        )
+        print(f"结果已保存到 {args.output}")
+    if not args.no_plot:
+        plot_em_fields(t, E_x, E_z, B_y, E_mag, B_mag, outfile=args.outfile, show=args.show)
 
 
 if __name__ == "__main__":
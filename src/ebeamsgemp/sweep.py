@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+sweep.py
+========
+
+Parameter sweeps over (Ek, d, tau0, N, T) for probe placement studies.
+
+A sweep is a table of scenarios built either as the Cartesian product of the
+given axes or from equal-length lists (one scenario per row). Scenarios are
+split into blocks and fanned out over a process pool; every block calls the
+existing single-scenario engines:
+
+    gaussian profile : gaussian_micro.compute_fields / compute_frequency_spectrum
+                       (or, with --universal, waveform_store: the whole block
+                       at once from the stored dimensionless waveforms)
+    uniform profile  : micropulse.compute_fields(engine="analytic")
+                       (both via macro_train.micropulse_response)
+    macropulse train : gaussian_macro.compute_macro_spectrum (Dirichlet factor)
+
+Results come back as one columnar table (dict of NumPy arrays, one row per
+scenario) holding peak |E|, peak |B|, FWHM and the micro/macro spectra on a
+shared frequency grid, and can be written to ``.npz``. With ``bands`` set, the
+table also holds the micropulse E_x energy in each frequency band,
+
+    band_energy = 2 * int_band |E(omega)|^2 d omega      (V^2 s / m^2),
+
+the share of int E_x(t)^2 dt carried by the band (Parseval, unitary transform
+as in compute_frequency_spectrum), by composite Gauss-Legendre quadrature.
+
+Example:
+    python -m ebeamsgemp.sweep --Ek 5 10 20 --d 0.5 1 2 --tau0 50e-12 100e-12 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import gaussian_macro, gaussian_micro, macro_train, result_cache, waveform_store
+
+# -----------------------------------------------------------------------------
+# Defaults
+# -----------------------------------------------------------------------------
+SWEEP_AXES = ("Ek", "d", "tau0", "N", "T")
+AXIS_DEFAULTS = {
+    "Ek": 10.0,        # MeV
+    "d": 1.0,          # m
+    "tau0": 100e-12,   # s
+    "N": 1e10,         # electrons per micropulse
+    "T": 550e-12,      # micropulse spacing (s)
+}
+PROFILES = ("gaussian", "uniform")
+MAX_BLOCK_SIZE = 256  # scenarios per pool task
+BAND_PANEL_NODES = 8  # Gauss-Legendre nodes per band panel
+BAND_PANELS_PER_SCALE = 16  # panels per 1 / max(tau0, t0/(beta*gamma)) of band width
+MAX_BAND_PANELS = 4096
+
+_worker_store: Optional[waveform_store.WaveformStore] = None  # set by the pool initializer
+
+
+@dataclass
+class SweepSettings:
+    """Grid and engine settings shared by every scenario of a sweep."""
+
+    profile: str = "gaussian"       # bunch shape: gaussian / uniform
+    Nt: int = 2001                  # time samples per scenario
+    span: float = 10.0              # half window in units of max(tau0, t0/(beta*gamma))
+    Nf: int = 512                   # shared log-spaced frequency grid
+    f_min: float = 1e6              # Hz
+    f_max: float = 3e10             # Hz
+    macro_duration: float = 1e-6    # macropulse length (s), sets k_max
+    quadrature: str = "gauss-hermite"  # gaussian_micro backend
+    store_spectra: bool = True      # keep (n, Nf) spectrum columns
+    universal: bool = False         # gaussian fields from waveform_store (interpolated)
+    bands: Tuple[Tuple[float, float], ...] = ()  # (f_low, f_high) Hz of band_energy columns
+
+    def frequencies(self) -> np.ndarray:
+        return np.logspace(np.log10(self.f_min), np.log10(self.f_max), self.Nf)
+
+
+# -----------------------------------------------------------------------------
+# Grid construction
+# -----------------------------------------------------------------------------
+def build_grid(mode: str = "product", **axes: Iterable[float]) -> Dict[str, np.ndarray]:
+    """
+    Build the scenario table.
+
+    mode="product" takes the Cartesian product of the given axes; mode="list"
+    zips equal-length sequences. Axes that are not given use AXIS_DEFAULTS.
+    """
+    unknown = set(axes) - set(SWEEP_AXES)
+    if unknown:
+        raise ValueError(f"Unknown sweep axes {sorted(unknown)}, expected {SWEEP_AXES}.")
+    values = {
+        name: np.atleast_1d(np.asarray(axes.get(name, AXIS_DEFAULTS[name]), dtype=float))
+        for name in SWEEP_AXES
+    }
+
+    if mode == "product":
+        mesh = np.meshgrid(*(values[name] for name in SWEEP_AXES), indexing="ij")
+        return {name: m.ravel() for name, m in zip(SWEEP_AXES, mesh)}
+    if mode == "list":
+        lengths = {v.size for v in values.values() if v.size > 1}
+        if len(lengths) > 1:
+            raise ValueError("mode='list' needs all multi-valued axes to have the same length.")
+        n = lengths.pop() if lengths else 1
+        return {name: np.broadcast_to(v, (n,)).copy() for name, v in values.items()}
+    raise ValueError(f"Unknown grid mode '{mode}', expected 'product' or 'list'.")
+
+
+# -----------------------------------------------------------------------------
+# Scenario evaluation
+# -----------------------------------------------------------------------------
+def _micro_spectrum(
+    freq: np.ndarray, params: gaussian_micro.SimulationParams, profile: str
+) -> np.ndarray:
+    """Micropulse spectrum; the uniform profile swaps the Gaussian form factor for sinc."""
+    if profile == "gaussian":
+        return gaussian_micro.compute_frequency_spectrum(freq, params)
+    # tau_0 = 0 turns the Gaussian form factor into 1 (point-bunch spectrum)
+    point = gaussian_micro.compute_frequency_spectrum(freq, replace(params, tau_0=0.0))
+    return point * np.sinc(2.0 * freq * params.tau_0)  # sin(w tau0) / (w tau0)
+
+
+def band_energy(
+    bands: Sequence[Tuple[float, float]], params: gaussian_micro.SimulationParams, profile: str
+) -> np.ndarray:
+    """2 * int |E(omega)|^2 d omega over each (f_low, f_high) band of one scenario (V^2 s / m^2)."""
+    nodes, weights = np.polynomial.legendre.leggauss(BAND_PANEL_NODES)
+    # the spectrum varies on 1/tau0 (form factor, sinc zeros) and on beta*gamma/t0 (K1):
+    # panels must resolve the faster of the two, i.e. the longer time scale
+    scale = max(params.t_0 / (params.beta * params.gamma), params.tau_0)
+    energy = np.empty(len(bands))
+    for k, (f_low, f_high) in enumerate(bands):
+        panels = int(np.clip(np.ceil((f_high - f_low) * scale * BAND_PANELS_PER_SCALE), 1, MAX_BAND_PANELS))
+        edges = np.linspace(f_low, f_high, panels + 1)
+        half = 0.5 * np.diff(edges)[:, None]
+        freq = (0.5 * (edges[1:] + edges[:-1]))[:, None] + half * nodes
+        spectrum = _micro_spectrum(freq.ravel(), params, profile)
+        # d omega = 2 pi df
+        energy[k] = 4.0 * np.pi * np.sum((half * weights).ravel() * np.abs(spectrum) ** 2)
+    return energy
+
+
+def _install_store(store: Optional[waveform_store.WaveformStore]) -> None:
+    """Pool initializer: hand the parent's waveform store to the worker once."""
+    global _worker_store
+    _worker_store = store
+
+
+def evaluate_block(
+    block: Dict[str, np.ndarray],
+    settings: SweepSettings,
+    store: Optional[waveform_store.WaveformStore] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate a block of scenarios and return its columns (runs in a worker).
+
+    With ``settings.universal`` the fields come from ``store`` (default: the
+    store installed by run_sweep's pool initializer, else waveform_store()).
+    Peak and FWHM are extracted for the whole (n, Nt) block at once.
+    """
+    n = len(block["Ek"])
+    freq = settings.frequencies()
+    omega = 2.0 * np.pi * freq
+
+    scenarios = [
+        gaussian_micro.SimulationParams(
+            N=block["N"][i],
+            Ek_MeV=block["Ek"][i],
+            tau_0=block["tau0"][i],
+            distance=block["d"][i],
+            Nt=settings.Nt,
+            quadrature=settings.quadrature,
+        )
+        for i in range(n)
+    ]
+    half_windows = np.array(
+        [settings.span * max(p.tau_0, p.t_0 / (p.beta * p.gamma)) for p in scenarios]
+    )
+    t_rows = half_windows[:, None] * np.linspace(-1.0, 1.0, settings.Nt)
+    if settings.universal:
+        store = store or _worker_store or waveform_store.waveform_store()
+        E_x, E_z, B_y = store.fields_batch(t_rows, block["Ek"], block["d"], block["N"], block["tau0"])
+    else:
+        E_x, E_z, B_y = (np.empty((n, settings.Nt)) for _ in range(3))
+        for i, params in enumerate(scenarios):
+            E_x[i], E_z[i], B_y[i] = macro_train.micropulse_response(t_rows[i], params, settings.profile)
+
+    e_metrics = gaussian_micro.compute_field_metrics_batch(t_rows, E_x, E_z)
+    b_metrics = gaussian_micro.compute_field_metrics_batch(t_rows, B_y, np.zeros_like(B_y))
+    out = {
+        "E_peak": e_metrics["E_peak"],
+        "B_peak": b_metrics["E_peak"],
+        "t_peak": e_metrics["t_peak"],
+        "FWHM_E": e_metrics["FWHM"],
+        "FWHM_B": b_metrics["FWHM"],
+        "k_max": np.full(n, np.nan),
+    }
+    if settings.store_spectra:
+        out["micro_spectrum"] = np.empty((n, settings.Nf))
+        out["macro_spectrum"] = np.empty((n, settings.Nf))
+    if settings.bands:
+        out["band_energy"] = np.empty((n, len(settings.bands)))
+
+    for i, params in enumerate(scenarios):
+        if settings.bands:
+            out["band_energy"][i] = band_energy(settings.bands, params, settings.profile)
+
+        k_max = int(settings.macro_duration / (2 * block["T"][i]))
+        out["k_max"][i] = k_max
+        if settings.store_spectra:
+            E_micro = _micro_spectrum(freq, params, settings.profile)
+            E_macro, _ = gaussian_macro.compute_macro_spectrum(omega, E_micro, block["T"][i], k_max)
+            out["micro_spectrum"][i] = np.abs(E_micro)
+            out["macro_spectrum"][i] = np.abs(E_macro)
+    return out
+
+
+def _split_blocks(table: Dict[str, np.ndarray], block_size: int) -> List[Dict[str, np.ndarray]]:
+    n = len(table["Ek"])
+    return [
+        {name: col[start:start + block_size] for name, col in table.items()}
+        for start in range(0, n, block_size)
+    ]
+
+
+def run_sweep(
+    table: Dict[str, np.ndarray],
+    settings: Optional[SweepSettings] = None,
+    workers: Optional[int] = None,
+    block_size: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Evaluate every scenario of ``table`` and return the columnar result table.
+
+    Scenarios are grouped into blocks (default: ~4 blocks per worker, at most
+    MAX_BLOCK_SIZE scenarios) so that 10^4+ point grids cost a few hundred pool
+    tasks rather than one task per scenario. workers=1 runs in-process. With
+    ``settings.universal`` the waveform store is built or loaded once here and
+    handed to every worker by the pool initializer.
+    """
+    settings = settings or SweepSettings()
+    if settings.profile not in PROFILES:
+        raise ValueError(f"Unknown profile '{settings.profile}', expected one of {PROFILES}.")
+    if settings.universal and settings.profile != "gaussian":
+        raise ValueError("Universal waveforms exist for the gaussian profile only.")
+    n = len(table["Ek"])
+    workers = workers or os.cpu_count() or 1
+    if block_size is None:
+        block_size = int(np.clip(-(-n // (4 * workers)), 1, MAX_BLOCK_SIZE))
+    blocks = _split_blocks(table, block_size)
+    store = waveform_store.waveform_store() if settings.universal else None
+
+    if workers == 1:
+        parts = [evaluate_block(block, settings, store) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_install_store, initargs=(store,)) as pool:
+            parts = list(pool.map(evaluate_block, blocks, itertools.repeat(settings)))
+
+    results = {name: np.asarray(col) for name, col in table.items()}
+    for name in parts[0]:
+        results[name] = np.concatenate([part[name] for part in parts])
+    if settings.store_spectra:
+        results["freq"] = settings.frequencies()
+    return results
+
+
+def save_results(path: str, results: Dict[str, np.ndarray]) -> None:
+    """Write the result table to a compressed ``.npz`` archive."""
+    np.savez_compressed(path, **results)
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parameter sweep over (Ek, d, tau0, N, T).")
+    parser.add_argument("--Ek", type=float, nargs="+", default=None, help="kinetic energies (MeV)")
+    parser.add_argument("--d", type=float, nargs="+", default=None, help="probe distances (m)")
+    parser.add_argument("--tau0", type=float, nargs="+", default=None, help="bunch half widths (s)")
+    parser.add_argument("--N", type=float, nargs="+", default=None, help="electrons per micropulse")
+    parser.add_argument("--T", type=float, nargs="+", default=None, help="micropulse spacing (s)")
+    parser.add_argument(
+        "--mode",
+        choices=("product", "list"),
+        default="product",
+        help="Cartesian product of the axes, or zip equal-length lists",
+    )
+    parser.add_argument("--profile", choices=PROFILES, default="gaussian", help="bunch shape")
+    parser.add_argument("--Nt", type=int, default=2001, help="time samples per scenario")
+    parser.add_argument("--Nf", type=int, default=512, help="frequency samples")
+    parser.add_argument("--no-spectra", action="store_true", help="skip spectrum columns")
+    parser.add_argument(
+        "--universal",
+        action="store_true",
+        help="interpolate gaussian fields from the stored dimensionless waveforms",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="bypass the on-disk result cache")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--output", type=str, default="sweep_results.npz", help="result archive")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.no_cache:
+        result_cache.set_enabled(False)
+    axes = {name: getattr(args, name) for name in SWEEP_AXES if getattr(args, name) is not None}
+    table = build_grid(args.mode, **axes)
+    settings = SweepSettings(
+        profile=args.profile,
+        Nt=args.Nt,
+        Nf=args.Nf,
+        store_spectra=not args.no_spectra,
+        universal=args.universal,
+    )
+
+    print(f"Scenarios : {len(table['Ek'])} ({args.mode}, {settings.profile} profile)")
+    start = time.perf_counter()
+    results = run_sweep(table, settings, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    save_results(args.output, results)
+
+    print(f"Peak |E|  : {np.nanmin(results['E_peak']):.3e} .. {np.nanmax(results['E_peak']):.3e} V/m")
+    print(f"Peak |B|  : {np.nanmin(results['B_peak']):.3e} .. {np.nanmax(results['B_peak']):.3e} T")
+    print(f"Elapsed   : {elapsed:.2f} s")
+    print(f"Saved     : {args.output}")
+
+
+if __name__ == "__main__":
+    main()
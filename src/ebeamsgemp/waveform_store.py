@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+waveform_store.py
+=================
+
+Universal dimensionless waveforms of Gaussian micropulses.
+
+The single-electron field is one curve (report/EM_field.md),
+
+    E_x(t) = -N e gamma / (4 pi eps0 d^2) * (1 + (t/a)^2)^(-3/2),   a = t0/(beta gamma),
+
+rescaled in amplitude and time for every Ek and d. Convolving it with the
+truncated Gaussian of gaussian_micro.compute_fields leaves a single shape
+parameter, the ratio r = tau0 / a = tau0 beta gamma / t0:
+
+    E_x(t) = P_x U_x(t/a; r),   E_z(t) = P_x (beta a / t0) U_z(t/a; r),   B_y = (beta/c) E_x,
+
+with P_x = -N e gamma / (4 pi eps0 d^2). The store holds U_x, U_z for ratios
+log-spaced over [RATIO_MIN, RATIO_MAX] (NODES_PER_DECADE per decade) and
+answers any (Ek, d, N, tau0) query by interpolation plus a rescale:
+
+    * node k stores f_k(v) = w_k U(v w_k; r_k) with w = sqrt(1 + r^2), so the
+      truncation edges of the bunch (u = +/-2r) sit near v = +/-2 for every r;
+      a cubic spline in v per node (uniform core, refined edges, log tails);
+    * between nodes, cubic Lagrange interpolation in log r (4 nearest nodes)
+      at fixed v = u / w(r);
+    * r < RATIO_MIN: the r = 0 curve (single_electron.calculate_EM_fields)
+      corrected by (r / RATIO_MIN)^2 towards the first node;
+    * |v| > V_MAX: the asymptotic tails U_x ~ |u|^-3 (1 + (6<s^2> - 3/2)/u^2),
+      U_z ~ sign(u) u^-2 (1 + (3<s^2> - 3/2)/u^2), <s^2> = r^2 * SIGMA2;
+    * r > RATIO_MAX: computed directly with gaussian_micro.compute_fields
+      (adaptive quadrature to NODE_RTOL; the default Simpson rule cannot
+      resolve the kernel at these ratios).
+
+Nodes are built once with gaussian_micro.compute_fields (spectral engine for
+the core, Gauss-Hermite for the tails) and kept in the on-disk result cache,
+so later processes only load them. The interpolation error is below
+WAVEFORM_RTOL relative to the peak of each component.
+
+Example:
+    store = waveform_store()
+    E_x, E_z, B_y = store.fields(t, gaussian_micro.SimulationParams(Ek_MeV=20, distance=0.5))
+    E_x, E_z, B_y = store.fields_batch(t_rows, Ek, d, N, tau0)   # one row per scenario
+"""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+from . import gaussian_micro, physics, result_cache, single_electron
+
+RATIO_MIN = 1e-3            # below: r = 0 curve with an r^2 correction
+RATIO_MAX = 1e3             # above: direct computation
+NODES_PER_DECADE = 32
+STENCIL = 4                 # nodes per cubic Lagrange interpolation in log r
+WAVEFORM_RTOL = 1e-5        # interpolation error relative to the component peak
+NODE_RTOL = 1e-8            # accuracy of the stored node waveforms
+V_CORE = 4.0                # uniform core |v| <= V_CORE
+CORE_POINTS = 801
+EDGE_HALF_WIDTH = 4.0       # uniform window around the bunch edges, in units of a
+EDGE_POINTS = 41
+EDGE_POINTS_PER_DECADE = 48 # geometric refinement beyond the window, out to the core size
+V_MAX = 1e3                 # stored tails up to |v| = V_MAX, asymptotic beyond
+TAIL_POINTS_PER_DECADE = 64
+SIGMA2 = 0.5 - 2.0 * math.exp(-4.0) / (math.sqrt(math.pi) * math.erf(2.0))  # <s^2> / tau0^2 of the truncated Gaussian
+
+Fields = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def pulse_ratio(params: gaussian_micro.SimulationParams) -> float:
+    """Shape parameter r = tau0 beta gamma / t0 of a micropulse."""
+    return params.tau_0 * params.beta * params.gamma / params.t_0
+
+
+def node_ratios() -> np.ndarray:
+    n_decades = math.log10(RATIO_MAX / RATIO_MIN)
+    return RATIO_MIN * 10.0 ** (np.arange(round(n_decades * NODES_PER_DECADE) + 1) / NODES_PER_DECADE)
+
+
+def node_grid(ratio: float) -> np.ndarray:
+    """Scaled sample points v of one node."""
+    w = math.hypot(1.0, ratio)
+    edge = 2.0 * ratio / w
+    # the truncation kinks decay over |u - edge| ~ a but with power-law tails
+    n_edge = int(math.ceil(math.log10(V_CORE * w / EDGE_HALF_WIDTH) * EDGE_POINTS_PER_DECADE)) + 1
+    far = np.geomspace(EDGE_HALF_WIDTH, max(V_CORE * w, EDGE_HALF_WIDTH), max(n_edge, 1))[1:]
+    window = np.concatenate([-far[::-1], np.linspace(-EDGE_HALF_WIDTH, EDGE_HALF_WIDTH, EDGE_POINTS), far]) / w
+    core = np.concatenate([np.linspace(-V_CORE, V_CORE, CORE_POINTS), edge + window, -edge - window])
+    core = core[np.abs(core) <= V_CORE]
+    n_tail = int(math.ceil(math.log10(V_MAX / V_CORE) * TAIL_POINTS_PER_DECADE)) + 1
+    tail = np.geomspace(V_CORE, V_MAX, n_tail)[1:]
+    v = np.unique(np.concatenate([-tail, core, tail]))
+    # drop near-coincident core/edge points, which would make the spline oscillate
+    min_gap = 1e-3 * min(2.0 * V_CORE / (CORE_POINTS - 1), 2.0 * EDGE_HALF_WIDTH / ((EDGE_POINTS - 1) * w))
+    return v[np.concatenate([[True], np.diff(v) > min_gap])]
+
+
+@result_cache.cached()
+def waveform_node(ratio: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(v, f_x, f_z) of one stored ratio, f = w U(v w; r); ratio 0 is the single-electron curve."""
+    v = node_grid(ratio)
+    w = math.hypot(1.0, ratio)
+    reference = gaussian_micro.SimulationParams(N=1.0)
+    a = reference.t_0 / (reference.beta * reference.gamma)
+    amplitude = -physics.coulomb_factor(reference.N * physics.E_CHARGE) * reference.gamma / reference.distance**2
+    z_scale = reference.beta * a / reference.t_0
+    t = v * w * a
+    if ratio == 0.0:
+        # calculate_EM_fields uses a charge of Q_E; rescale to N = 1
+        E_x, _, E_z = single_electron.calculate_EM_fields(
+            t, reference.gamma, reference.beta, reference.beta * physics.C_LIGHT, reference.distance, 0.0, 0.0
+        )[:3]
+        scale = 1.0 / (single_electron.Q_E / physics.E_CHARGE)
+        E_x, E_z = E_x * scale, E_z * scale
+    else:
+        core = np.abs(v) <= V_CORE
+        E_x, E_z = np.empty_like(t), np.empty_like(t)
+        with result_cache.bypass():
+            for mask, quadrature in ((core, "spectral"), (~core, "gauss-hermite")):
+                params = gaussian_micro.SimulationParams(
+                    N=1.0, tau_0=ratio * a, quadrature=quadrature, rtol=NODE_RTOL
+                )
+                E_x[mask], E_z[mask], _ = gaussian_micro.compute_fields(t[mask], params)
+    return v, w * E_x / amplitude, w * E_z / (amplitude * z_scale)
+
+
+def lagrange_weights(theta: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Cubic Lagrange weights of the nodes at 0, 1, 2, 3 for the position theta."""
+    t0, t1, t2, t3 = theta, theta - 1.0, theta - 2.0, theta - 3.0
+    return -t1 * t2 * t3 / 6.0, t0 * t2 * t3 / 2.0, -t0 * t1 * t3 / 2.0, t0 * t1 * t2 / 6.0
+
+
+class WaveformStore:
+    """Interpolating store of the dimensionless waveforms U_x(u; r), U_z(u; r)."""
+
+    def __init__(self) -> None:
+        from scipy.interpolate import CubicSpline
+
+        self.ratios = node_ratios()
+        self.log_ratios = np.log(self.ratios)
+        self.step = self.log_ratios[1] - self.log_ratios[0]
+
+        def spline(ratio: float) -> "CubicSpline":
+            v, f_x, f_z = waveform_node(float(ratio))
+            return CubicSpline(v, np.stack([f_x, f_z], axis=-1))  # one interval search for both
+
+        self.zero = spline(0.0)
+        self.nodes = [spline(ratio) for ratio in self.ratios]
+
+    # ------------------------------------------------------------------
+    def dimensionless(self, u: np.ndarray, ratio: float) -> Tuple[np.ndarray, np.ndarray]:
+        """U_x(u; r), U_z(u; r) for one ratio (any shape of u)."""
+        u = np.asarray(u, dtype=float)
+        U_x, U_z = self.dimensionless_batch(u.reshape(1, -1), np.array([ratio]))
+        return U_x.reshape(u.shape), U_z.reshape(u.shape)
+
+    def dimensionless_batch(self, u: np.ndarray, ratios: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """U_x, U_z for rows u[i] (shape (n, Nt)) with ratios[i]; ratios must be <= RATIO_MAX."""
+        u = np.atleast_2d(np.asarray(u, dtype=float))
+        ratios = np.asarray(ratios, dtype=float)
+        if np.any(ratios > RATIO_MAX) or np.any(ratios < 0.0):
+            raise ValueError(f"ratios must lie in [0, {RATIO_MAX:g}] (larger ones: compute directly).")
+        w = np.hypot(1.0, ratios)[:, None]
+        v = u / w
+        U_x = np.empty_like(v)
+        U_z = np.empty_like(v)
+
+        # first node of the 4-node stencil and position inside it; -1 marks the r = 0 .. RATIO_MIN interval
+        position = (np.log(np.maximum(ratios, RATIO_MIN)) - self.log_ratios[0]) / self.step
+        first = np.clip(np.floor(position).astype(int) - 1, 0, len(self.ratios) - STENCIL)
+        theta = position - first
+        small = ratios < RATIO_MIN
+        first[small] = -1
+        theta[small] = (ratios[small] / RATIO_MIN) ** 2
+
+        for k in np.unique(first):
+            rows = np.flatnonzero(first == k)
+            vk = v[rows]
+            inside = np.abs(vk) <= V_MAX
+            points = np.clip(vk, -V_MAX, V_MAX)
+            t_k = theta[rows, None]
+            if k < 0:
+                nodes, weights = (self.zero, self.nodes[0]), (1.0 - t_k, t_k)
+            else:
+                nodes, weights = self.nodes[k : k + STENCIL], lagrange_weights(t_k)
+            value = sum(weight[..., None] * node(points) for node, weight in zip(nodes, weights))
+            value[~inside] = 0.0
+            value /= w[rows, :, None]
+            U_x[rows], U_z[rows] = value[..., 0], value[..., 1]
+
+        far = np.abs(v) > V_MAX
+        if far.any():
+            rows, cols = np.nonzero(far)
+            uf = u[rows, cols]
+            s2 = SIGMA2 * ratios[rows] ** 2
+            U_x[rows, cols] = np.abs(uf) ** -3 * (1.0 + (6.0 * s2 - 1.5) / uf**2)
+            U_z[rows, cols] = np.sign(uf) * uf**-2 * (1.0 + (3.0 * s2 - 1.5) / uf**2)
+        return U_x, U_z
+
+    # ------------------------------------------------------------------
+    def fields(self, t_array: np.ndarray, params: gaussian_micro.SimulationParams) -> Fields:
+        """E_x, E_z, B_y as gaussian_micro.compute_fields(t_array, params)."""
+        E_x, E_z, B_y = self.fields_batch(
+            np.asarray(t_array, dtype=float).reshape(1, -1), params.Ek_MeV, params.distance, params.N, params.tau_0
+        )
+        return E_x[0], E_z[0], B_y[0]
+
+    def fields_batch(self, t: np.ndarray, Ek: np.ndarray, d: np.ndarray, N: np.ndarray, tau0: np.ndarray) -> Fields:
+        """
+        E_x, E_z, B_y of n scenarios, shape (n, Nt).
+
+        ``t`` is either one shared time axis (Nt,) or one row per scenario
+        (n, Nt); Ek (MeV), d (m), N and tau0 (s) are scalars or length-n arrays.
+        """
+        Ek, d, N, tau0 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (Ek, d, N, tau0)))
+        t = np.asarray(t, dtype=float)
+        t = np.broadcast_to(t, (len(Ek), t.shape[-1]))
+        gamma = 1.0 + Ek / physics.ELECTRON_REST_ENERGY_MEV   # physics.lorentz_factors, vectorised
+        beta = np.sqrt(1.0 - 1.0 / gamma**2)
+        t_0 = physics.transit_time(d)
+        a = t_0 / (beta * gamma)
+        ratios = tau0 / a
+        amplitude = -physics.coulomb_factor(N * physics.E_CHARGE) * gamma / d**2
+
+        E_x = np.empty(t.shape)
+        E_z = np.empty(t.shape)
+        stored = ratios <= RATIO_MAX
+        if stored.any():
+            U_x, U_z = self.dimensionless_batch(t[stored] / a[stored, None], ratios[stored])
+            E_x[stored] = amplitude[stored, None] * U_x
+            E_z[stored] = (amplitude * beta * a / t_0)[stored, None] * U_z
+        for i in np.flatnonzero(~stored):
+            params = gaussian_micro.SimulationParams(
+                N=N[i], Ek_MeV=Ek[i], tau_0=tau0[i], distance=d[i], quadrature="adaptive", rtol=NODE_RTOL
+            )
+            E_x[i], E_z[i], _ = gaussian_micro.compute_fields(t[i], params)
+        B_y = beta[:, None] / physics.C_LIGHT * E_x
+        return E_x, E_z, B_y
+
+
+@lru_cache(maxsize=None)
+def waveform_store() -> WaveformStore:
+    """The process-wide store (nodes from the result cache, built on first use)."""
+    return WaveformStore()
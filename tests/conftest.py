@@ -0,0 +1,10 @@
+import pytest
+
+from ebeamsgemp import result_cache
+
+
+@pytest.fixture(autouse=True)
+def no_result_cache():
+    """Keep the tests off the on-disk result cache."""
+    with result_cache.bypass():
+        yield
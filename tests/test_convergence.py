@@ -0,0 +1,35 @@
+import pytest
+
+from ebeamsgemp import convergence
+
+
+def _second_order(grid):
+    """Metrics with a known h^2 discretisation error, h = 1 / (N - 1)."""
+    h = 1.0 / (grid["N"] - 1)
+    return {"peak_E": 1.0 + 0.3 * h * h, "FWHM": 2.0 - 0.1 * h * h}
+
+
+def test_converge_observes_the_order():
+    result = convergence.converge(_second_order, {"N": 9}, ("N",), 1e-5, {"N": 1 << 16})
+    assert result.converged
+    assert len(result.history) >= convergence.MIN_LEVELS
+    assert result.extrapolated["peak_E"] == pytest.approx(1.0, rel=1e-6)
+    true_error = abs(result.metrics["peak_E"] - 1.0)
+    assert true_error <= 1e-5
+    assert result.error["peak_E"] == pytest.approx(true_error, rel=0.05)
+
+
+def test_converge_respects_minimum_levels_on_smooth_metrics():
+    def constant(grid):
+        return {"peak_E": 1.0, "FWHM": 1.0}
+
+    result = convergence.converge(constant, {"N": 9}, ("N",), 1e-3, {"N": 1 << 16})
+    assert len(result.history) == convergence.MIN_LEVELS
+
+
+def test_verify_grid_rejects_a_coarse_grid():
+    assert convergence.verify_grid(_second_order, {"N": 2049}, ("N",), 1e-6).converged
+    checked = convergence.verify_grid(_second_order, {"N": 9}, ("N",), 1e-3)
+    assert not checked.converged
+    assert checked.cached
+    assert [entry["grid"]["N"] for entry in checked.history] == [9, 17]
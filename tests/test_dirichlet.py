@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from ebeamsgemp import line_spectrum
+from ebeamsgemp.dirichlet import dirichlet_sum
+
+T = 550e-12
+
+
+def _direct(omega, k_max, offsets=(0.0,), weights=(1.0,)):
+    k = np.arange(-k_max, k_max + 1)
+    return sum(a * np.cos(np.outer(omega - w, k * T)).sum(axis=1) for w, a in zip(offsets, weights))
+
+
+@pytest.mark.parametrize("k_max", [0, 3, 909])
+def test_limit_at_odd_and_even_harmonics(k_max):
+    """D_M(2*pi*n) = +M for every n, odd harmonics included."""
+    n = np.arange(1, 200)
+    omega = 2 * np.pi * n / T
+    F = dirichlet_sum(omega, T, k_max)
+    np.testing.assert_allclose(F, 2 * k_max + 1, rtol=1e-12)
+    np.testing.assert_allclose(F[n % 2 == 1], _direct(omega, k_max)[n % 2 == 1], rtol=1e-9)
+
+
+def test_matches_direct_sum_with_sidebands():
+    omega = np.linspace(0.0, 40 * 2 * np.pi / T, 4001)
+    offsets = (0.0, np.pi / (2 * T), -np.pi / (2 * T))
+    weights = (1.0, 0.25, 0.25)
+    F = dirichlet_sum(omega, T, 20, offsets, weights, chunk_size=512)
+    np.testing.assert_allclose(F, _direct(omega, 20, offsets, weights), rtol=0, atol=1e-9 * 41)
+
+
+def test_float32_close_to_float64():
+    omega = np.linspace(1e8, 1e11, 10001)
+    F64 = dirichlet_sum(omega, T, 50)
+    F32 = dirichlet_sum(omega, T, 50, dtype="float32")
+    assert F32.dtype == np.float32
+    assert np.max(np.abs(F32 - F64)) < 1e-4 * 101
+
+
+def test_line_amplitudes_at_odd_harmonics():
+    k_max = 10
+    lines = line_spectrum.compute_line_spectrum(lambda w: np.ones_like(w), 0.5 / T, 20.5 / T, T, k_max)
+    odd = lines["harmonic"] % 2 == 1
+    assert odd.any()
+    np.testing.assert_allclose(lines["amplitude"][odd], 2 * k_max + 1, rtol=1e-12)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from ebeamsgemp import gaussian_macro
+from ebeamsgemp.dirichlet import dirichlet_sum
+
+T = 550e-12
+K_MAX = 20
+
+
+def test_ensemble_closed_form_limits():
+    omega = np.linspace(1e8, 3e10, 500)
+    E_micro = np.exp(-((omega * 1e-11) ** 2))
+    D = dirichlet_sum(omega, T, K_MAX)
+    power, coherent = gaussian_macro.compute_ensemble_spectrum(omega, E_micro, T, K_MAX, 0.0)
+    np.testing.assert_allclose(power, (E_micro * D) ** 2)
+    np.testing.assert_allclose(coherent, power)
+    # very large jitter: the coherent part vanishes and every bunch adds incoherently
+    power, coherent = gaussian_macro.compute_ensemble_spectrum(omega, E_micro, T, K_MAX, 1e-6, 0.1)
+    np.testing.assert_allclose(power, E_micro**2 * (2 * K_MAX + 1) * (1.0 + 0.1**2))
+    assert np.max(coherent) < 1e-12
+
+
+def test_ensemble_closed_form_matches_monte_carlo():
+    omega = 2 * np.pi * np.array([1.0, 1.25, 3.0, 7.5]) / T  # harmonic lines and continuum
+    E_micro = np.ones_like(omega)
+    mean_charges = np.linspace(1.2, 0.8, 2 * K_MAX + 1)
+    args = (omega, E_micro, T, K_MAX, 5e-12, 0.05, mean_charges)
+    expected, _ = gaussian_macro.compute_ensemble_spectrum(*args)
+    mean, var = gaussian_macro.monte_carlo_ensemble_spectrum(*args, n_realisations=2000, seed=3)
+    n = 2000
+    assert np.all(np.abs(mean - expected) < 5 * np.sqrt(var / n))
@@ -0,0 +1,35 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from ebeamsgemp import gaussian_micro
+
+
+@pytest.fixture
+def params():
+    return gaussian_micro.SimulationParams(Nt=401)
+
+
+def _times(params):
+    return np.linspace(params.t_min, params.t_max, params.Nt)
+
+
+def test_gauss_hermite_chunking_uses_one_rule(params):
+    params = replace(params, quadrature="gauss-hermite")
+    t = _times(params)
+    whole = gaussian_micro.compute_fields(t, params)
+    chunked_params = replace(params, max_memory=2e5)
+    assert gaussian_micro.chunk_layout(t.size, chunked_params)[1] > 1
+    chunked = gaussian_micro.compute_fields(t, chunked_params)
+    for a, b in zip(whole, chunked):
+        np.testing.assert_allclose(b, a, rtol=0, atol=1e-12 * np.max(np.abs(a)))
+
+
+@pytest.mark.parametrize("quadrature", ["gauss-hermite", "adaptive"])
+def test_backends_match_simpson(params, quadrature):
+    t = _times(params)
+    reference = gaussian_micro.compute_fields(t, params)
+    fields = gaussian_micro.compute_fields(t, replace(params, quadrature=quadrature))
+    for a, b in zip(reference, fields):
+        assert np.max(np.abs(b - a)) < 1e-6 * np.max(np.abs(a))
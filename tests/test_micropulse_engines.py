@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from ebeamsgemp import micropulse
+
+TAU0 = 100e-12
+
+
+def _setup(Ek=10e6, tau0=TAU0, Nz=4000):
+    gamma, beta, v0 = micropulse.compute_gamma_beta_v0(Ek)
+    lam = micropulse.compute_line_charge_density(1e10, v0, tau0)
+    z_prime = np.linspace(-v0 * tau0, v0 * tau0, Nz)
+    return beta, v0, lam, z_prime
+
+
+def _relative_error(fields, reference):
+    """Largest Ex/Ez deviation relative to the peak field."""
+    peak = np.max(np.hypot(reference["Ex"], reference["Ez"]))
+    return max(np.max(np.abs(fields[key] - reference[key])) for key in ("Ex", "Ez")) / peak
+
+
+@pytest.mark.parametrize("engine", ["fft", "analytic"])
+def test_engines_match_trapz(engine):
+    beta, v0, lam, z_prime = _setup()
+    times = np.linspace(-10 * TAU0, 10 * TAU0, 2001)
+    reference = micropulse.compute_fields(times, z_prime, beta, v0, 1.0, lam)
+    fields = micropulse.compute_fields(times, z_prime, beta, v0, 1.0, lam, engine=engine)
+    assert _relative_error(fields, reference) < 1e-6
+
+
+@pytest.mark.parametrize(
+    "Ek, tau0, d, span, Nt",
+    [
+        (10e6, 100e-12, 1.0, 200, 2001),  # dt resolves the bunch but not the kernel well
+        (100e6, 1e-9, 0.01, 5, 4001),  # kernel much narrower than dt: polyphase path
+    ],
+)
+def test_fft_matches_analytic(Ek, tau0, d, span, Nt):
+    beta, v0, lam, z_prime = _setup(Ek, tau0)
+    times = np.linspace(-span * tau0, span * tau0, Nt)
+    reference = micropulse.compute_fields(times, z_prime, beta, v0, d, lam, engine="analytic")
+    fields = micropulse.compute_fields(times, z_prime, beta, v0, d, lam, engine="fft")
+    assert _relative_error(fields, reference) < 1e-6
+
+
+def test_trapz_workers_bit_identical():
+    beta, v0, lam, z_prime = _setup(Nz=500)
+    times = np.linspace(-5 * TAU0, 5 * TAU0, 301)
+    serial = micropulse.compute_fields(times, z_prime, beta, v0, 1.0, lam, batch_size=16)
+    threaded = micropulse.compute_fields(
+        times, z_prime, beta, v0, 1.0, lam, batch_size=16, workers=3
+    )
+    for key in serial:
+        np.testing.assert_array_equal(serial[key], threaded[key])
+
+
+def test_cubic_quadrature_weights_exact_for_cubics():
+    a, b, h = -0.37, 1.21, 0.1
+    weights, k_first = micropulse.cubic_quadrature_weights(a, b, h)
+    nodes = (k_first + np.arange(len(weights))) * h
+    poly = np.polynomial.Polynomial([0.3, -1.0, 2.0, 0.7])
+    exact = poly.integ()(b) - poly.integ()(a)
+    assert weights @ poly(nodes) == pytest.approx(exact, rel=1e-12)
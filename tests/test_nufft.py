@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from ebeamsgemp import gaussian_macro
+from ebeamsgemp.dirichlet import dirichlet_sum
+from ebeamsgemp.nufft import direct_sum, nufft_type3
+
+T = 550e-12
+K_MAX = 20
+
+
+@pytest.mark.parametrize("eps", [1e-6, 1e-12])
+def test_nufft_type3_matches_direct_sum(eps):
+    rng = np.random.default_rng(1)
+    t = np.sort(rng.uniform(-1e-7, 1e-7, 300))
+    q = rng.uniform(0.5, 1.5, t.size)
+    omega = np.linspace(1e8, 2e10, 5000)
+    reference = direct_sum(t, q, omega)
+    F = nufft_type3(t, q, omega, eps=eps, method="nufft")
+    assert np.max(np.abs(F - reference)) <= 10 * eps * np.sum(np.abs(q))
+
+
+def test_nufft_type3_batches_rows_independently():
+    rng = np.random.default_rng(2)
+    t = rng.uniform(0.0, 1e-8, (3, 50))
+    q = rng.standard_normal((3, 50)) + 1j * rng.standard_normal((3, 50))
+    omega = rng.uniform(-1e10, 1e10, 2000)
+    F = nufft_type3(t, q, omega, eps=1e-10, method="nufft")
+    assert F.shape == (3, 2000)
+    for row in range(3):
+        np.testing.assert_allclose(F[row], direct_sum(t[row], q[row], omega), rtol=0, atol=1e-8)
+
+
+def test_train_spectrum_reproduces_dirichlet_factor():
+    omega = np.linspace(0.0, 30 * 2 * np.pi / T, 20001)
+    k = np.arange(-K_MAX, K_MAX + 1)
+    _, F = gaussian_macro.compute_train_spectrum(omega, np.ones_like(omega), k * T)
+    np.testing.assert_allclose(F.real, dirichlet_sum(omega, T, K_MAX), rtol=0, atol=1e-9)
+    assert np.max(np.abs(F.imag)) < 1e-9
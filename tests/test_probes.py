@@ -0,0 +1,23 @@
+import numpy as np
+
+from ebeamsgemp import probes
+
+
+def test_single_electron_scales_with_N():
+    positions = np.array([[1.0, 0.0, 0.0], [0.3, 0.4, 2.0]])
+    t = probes.arrival_windows(positions, 10.0, 0.0, 401, probes.SPAN_DEFAULT)
+    default = probes.single_electron_fields(t, positions, 10.0)
+    scaled = probes.single_electron_fields(t, positions, 10.0, N=2e7)
+    for name in ("Ex", "Ey", "Ez", "Bx", "By", "|E|", "|B|"):
+        np.testing.assert_allclose(scaled[name], 2e-3 * default[name], rtol=1e-12, atol=0.0)
+
+
+def test_single_electron_matches_short_uniform_bunch():
+    # a bunch far shorter than the pulse width rho / (c beta gamma) looks like a point charge
+    positions = np.array([[1.0, 0.0, 0.0]])
+    t = probes.arrival_windows(positions, 10.0, 0.0, 401, probes.SPAN_DEFAULT)
+    point = probes.single_electron_fields(t, positions, 10.0, N=3e9)
+    bunch = probes.micropulse_fields(t, positions, 10.0, N=3e9, tau0=1e-14)
+    peak = np.max(point["|E|"])
+    np.testing.assert_allclose(bunch["|E|"], point["|E|"], rtol=0.0, atol=1e-3 * peak)
+    np.testing.assert_allclose(bunch["|B|"], point["|B|"], rtol=0.0, atol=1e-3 * np.max(point["|B|"]))
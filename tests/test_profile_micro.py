@@ -0,0 +1,14 @@
+import numpy as np
+
+from ebeamsgemp import gaussian_micro, profile_micro
+
+
+def test_sampled_gaussian_matches_gaussian_micro():
+    params = gaussian_micro.SimulationParams(Nt=1001, Ntau=4001)
+    tau = np.linspace(-2 * params.tau_0, 2 * params.tau_0, 401)
+    tau, lam = profile_micro.normalise_profile(tau, np.exp(-((tau / params.tau_0) ** 2)), params.N)
+    t = np.linspace(params.t_min, params.t_max, params.Nt)
+    fields = profile_micro.compute_fields(t, tau, lam, params)
+    reference = gaussian_micro.compute_fields(t, params)
+    for a, b in zip(fields, reference):
+        assert np.max(np.abs(a - b)) < 2e-6 * np.max(np.abs(b))
@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pytest
+
+from ebeamsgemp import result_cache
+
+
+def _square(x):
+    return x * x
+
+
+def test_key_depends_on_arguments_and_package_sources(monkeypatch):
+    x = np.arange(4.0)
+    key = result_cache.make_key(_square, {"x": x})
+    assert key == result_cache.make_key(_square, {"x": x.copy()})
+    assert key != result_cache.make_key(_square, {"x": x + 1})
+    assert key != result_cache.make_key(_square, {"x": x.astype(np.float32)})
+    monkeypatch.setattr(result_cache, "engine_digest", lambda: "edited helper module")
+    assert key != result_cache.make_key(_square, {"x": x})
+
+
+def test_unhashable_argument_raises():
+    with pytest.raises(TypeError):
+        result_cache.make_key(_square, {"x": object()})
+
+
+def test_store_and_load_round_trip(tmp_path):
+    cache = result_cache.ResultCache(str(tmp_path))
+    value = {"Ex": np.linspace(0.0, 1.0, 5), "Ez": np.zeros(3)}
+    cache.store("ab" + "0" * 62, value)
+    loaded = cache.load("ab" + "0" * 62)
+    assert set(loaded) == set(value)
+    for name in value:
+        np.testing.assert_array_equal(loaded[name], value[name])
+    assert cache.load("cd" + "0" * 62) is None
+
+
+def test_store_evicts_oldest_entries_to_low_water(tmp_path):
+    cache = result_cache.ResultCache(str(tmp_path))
+    keys = [f"{i:02x}" + "0" * 62 for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.store(key, np.zeros(1000))
+        os.utime(cache._path(key), (1e9 + i, 1e9 + i))
+    entry = cache.size() // len(keys)
+    cache.max_bytes = int(9.5 * entry)  # next store overflows the cap
+    cache.store("ff" + "0" * 62, np.zeros(1000))
+    assert cache.size() <= result_cache.LOW_WATER * cache.max_bytes
+    assert cache.load(keys[0]) is None  # least recently used went first
+    assert cache.load("ff" + "0" * 62) is not None
+    assert cache.load(keys[-1]) is not None
+
+
+def test_set_enabled_exports_to_worker_processes(monkeypatch):
+    monkeypatch.setenv("EBEAMSGEMP_CACHE", "1")
+    enabled = result_cache.get_cache().enabled
+    try:
+        result_cache.set_enabled(False)
+        assert os.environ["EBEAMSGEMP_CACHE"] == "0"
+    finally:
+        result_cache.set_enabled(enabled)
+
+
+def test_overwriting_an_entry_keeps_the_size_exact(tmp_path):
+    cache = result_cache.ResultCache(str(tmp_path))
+    key = "ab" + "0" * 62
+    cache.store(key, np.zeros(1000))
+    cache.size()
+    for length in (1000, 10, 5000):
+        cache.store(key, np.zeros(length))
+        assert cache._size == os.path.getsize(cache._path(key))
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from ebeamsgemp import result_cache, results, surrogate, sweep
+
+RANGES = {"Ek": (5.0, 20.0), "d": (0.5, 2.0), "tau0": (50e-12, 200e-12)}
+BANDS = ((1e8, 1e9), (1e9, 1e10))
+
+
+@pytest.fixture(scope="module")
+def table():
+    with result_cache.bypass():
+        return surrogate.build_table(
+            RANGES, points_per_decade=4, tau0_points_per_decade=4, profiles=("uniform",), bands=BANDS,
+            workers=1, validation_samples=16,
+        )
+
+
+def test_evaluate_at_nodes_and_within_bounds(table):
+    assert all(table.axes[name].size == surrogate.STENCIL for name in surrogate.TABLE_AXES)
+    node = table.evaluate(table.axes["Ek"][1], table.axes["d"][2], table.axes["tau0"][1], N=1.0, profile="uniform")
+    stored = np.exp(table.log_values[0, 1, 2, 1])
+    for c, name in enumerate(surrogate.METRICS):
+        np.testing.assert_allclose(node[name], stored[c], rtol=1e-12)
+    np.testing.assert_allclose(node["band_energy"], stored[len(surrogate.METRICS):], rtol=1e-12)
+
+    grid = sweep.build_grid("list", Ek=[9.0], d=[1.1], tau0=[120e-12], N=[1e10])
+    exact = sweep.run_sweep(grid, surrogate._settings("uniform", table.bands, universal=False), workers=1)
+    approx = table.evaluate(grid["Ek"], grid["d"], grid["tau0"], grid["N"], "uniform")
+    errors = surrogate.relative_errors(approx, exact)
+    bounds = table.error_bounds["uniform"]
+    for name, error in errors.items():
+        assert error <= bounds[name]
+
+
+def test_save_load_round_trip_and_rejection(table, tmp_path):
+    path = str(tmp_path / "table.npz")
+    table.save(path)
+    loaded = surrogate.SurrogateTable.load(path)
+    assert loaded.profiles == table.profiles and loaded.error_bounds == table.error_bounds
+    np.testing.assert_array_equal(loaded.log_values, table.log_values)
+    np.testing.assert_array_equal(loaded.bands, table.bands)
+
+    arrays = {**table.axes, "bands": table.bands, "log_values": table.log_values}
+    for key, value in (("table_format", surrogate.TABLE_FORMAT + 1), ("engine_digest", "0" * 16)):
+        results.save_results(path, surrogate.TABLE_KIND, arrays, {**table.metadata, key: value})
+        with pytest.raises(ValueError, match="table format" if key == "table_format" else "engine sources"):
+            surrogate.SurrogateTable.load(path)
+    stale = surrogate.SurrogateTable.load(path, allow_stale=True)
+    np.testing.assert_array_equal(stale.log_values, table.log_values)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from ebeamsgemp import gaussian_micro, sweep
+
+
+def test_batch_metrics_match_single_rows():
+    rng = np.random.default_rng(0)
+    t_rows = np.linspace(-1.0, 1.0, 401) * rng.uniform(0.5, 2.0, (40, 1))
+    centre = rng.uniform(-0.5, 0.5, (40, 1))
+    width = rng.uniform(0.02, 2.0, (40, 1))  # the widest pulses never fall to half maximum
+    E_x = np.exp(-(((t_rows - centre) / width) ** 2)) * rng.uniform(1e-9, 1e3, (40, 1))
+    E_z = 0.1 * E_x * np.sin(7.0 * t_rows)
+    batch = gaussian_micro.compute_field_metrics_batch(t_rows, E_x, E_z)
+    assert np.isnan(batch["FWHM"]).any() and np.isfinite(batch["FWHM"]).any()
+    for i in range(40):
+        single = gaussian_micro.compute_field_metrics(t_rows[i], E_x[i], E_z[i])
+        for name, value in single.items():
+            np.testing.assert_array_equal(batch[name][i], value)
+
+
+def test_pool_matches_in_process():
+    table = sweep.build_grid(Ek=[1.0, 30.0], d=[0.3, 3.0], tau0=[20e-12, 500e-12])
+    settings = sweep.SweepSettings(profile="uniform", Nt=401, Nf=64, bands=((1e8, 1e9),))
+    serial = sweep.run_sweep(table, settings, workers=1)
+    pooled = sweep.run_sweep(table, settings, workers=2, block_size=3)
+    assert serial.keys() == pooled.keys()
+    for name in serial:
+        np.testing.assert_array_equal(serial[name], pooled[name])
+
+
+def test_band_energy_resolves_sinc_lobes(monkeypatch):
+    # uniform bunch far longer than the single-electron pulse: the band spans ~30 sinc lobes
+    params = gaussian_micro.SimulationParams(N=1.0, Ek_MeV=96.0, tau_0=3.7e-10, distance=0.33, Nt=64)
+    bands = ((1e9, 1e10), (1e10, 3e10))
+    energy = sweep.band_energy(bands, params, "uniform")
+    monkeypatch.setattr(sweep, "BAND_PANELS_PER_SCALE", 128)
+    reference = sweep.band_energy(bands, params, "uniform")
+    np.testing.assert_allclose(energy, reference, rtol=1e-6)
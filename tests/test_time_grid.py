@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from ebeamsgemp import time_grid
+
+
+def _lorentzian(t):
+    return np.stack([1.0 / (1.0 + t * t), t / (1.0 + t * t) ** 1.5])
+
+
+def test_grid_meets_rtol_and_returns_values():
+    t, values = time_grid.adaptive_time_grid(_lorentzian, -1e4, 1e4, 1.0, rtol=1e-4)
+    assert np.all(np.diff(t) > 0)
+    np.testing.assert_array_equal(values, _lorentzian(t))
+    probe = np.linspace(-50.0, 50.0, 20001)
+    interpolated = np.stack([np.interp(probe, t, row) for row in values])
+    assert np.max(np.abs(interpolated - _lorentzian(probe))) < 2e-4
+
+
+def test_point_cap_warns_and_refines_largest_errors():
+    def narrow_peak(t):  # unresolved peak at t = 40, far right of the initial core
+        return np.atleast_2d(np.exp(-(((t - 40.0) / 0.5) ** 2)) + 1.0 / (1.0 + t * t))
+
+    full, _ = time_grid.adaptive_time_grid(narrow_peak, -100.0, 100.0, 1.0, rtol=1e-6)
+    cap = (time_grid.initial_time_grid(-100.0, 100.0, 1.0).size + full.size) // 2
+    with pytest.warns(RuntimeWarning, match="max_points"):
+        t, _ = time_grid.adaptive_time_grid(narrow_peak, -100.0, 100.0, 1.0, rtol=1e-6, max_points=cap)
+    assert t.size == cap
+    assert np.count_nonzero(np.abs(t - 40.0) < 1.0) > 20  # budget went to the peak
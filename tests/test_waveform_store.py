@@ -0,0 +1,18 @@
+import numpy as np
+
+from ebeamsgemp import gaussian_micro, physics, waveform_store
+
+
+def test_fields_batch_above_ratio_max_matches_adaptive():
+    params = gaussian_micro.SimulationParams(
+        Ek_MeV=20.0, distance=0.01, tau_0=1e-9, quadrature="adaptive", rtol=1e-6
+    )
+    gamma, beta, _ = physics.lorentz_factors(params.Ek_MeV)
+    assert params.tau_0 * beta * gamma / physics.transit_time(params.distance) > waveform_store.RATIO_MAX
+    t = np.linspace(-2.5e-9, 2.5e-9, 201)
+    # only the direct path runs above RATIO_MAX, so the stored nodes are never built
+    store = waveform_store.WaveformStore.__new__(waveform_store.WaveformStore)
+    E_x, E_z, B_y = store.fields(t, params)
+    ref_x, ref_z, ref_b = gaussian_micro.compute_fields(t, params)
+    for value, ref in ((E_x, ref_x), (E_z, ref_z), (B_y, ref_b)):
+        np.testing.assert_allclose(value, ref, rtol=0.0, atol=1e-5 * np.max(np.abs(ref)))